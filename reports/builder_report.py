@@ -4,18 +4,39 @@ Builder Defect Management Report Generator - COMPLETE VERSION
 """
 
 import pandas as pd
+import numpy as np
 from datetime import datetime
 from io import BytesIO
 import streamlit as st
 from openpyxl import Workbook
 from openpyxl.chart import BarChart, Reference
-from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.styles import Font, PatternFill, Alignment, NamedStyle
 from openpyxl.drawing.image import Image as XLImage
-from PIL import Image as PILImage
+from openpyxl.drawing.spreadsheet_drawing import OneCellAnchor, AnchorMarker
+from openpyxl.drawing.xdr import XDRPositiveSize2D
+from openpyxl.utils.units import pixels_to_EMU
+from openpyxl.worksheet.dimensions import RowDimension
+from PIL import Image as PILImage, ImageOps
 import logging
 import sqlite3
 import os
+import shutil
 import tempfile
+import time
+import zipfile
+import hashlib
+from collections import deque
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# pyvips (libvips) is optional - it shrinks photos while decoding, so it is
+# used for thumbnails when installed, with Pillow as the fallback
+try:
+    import pyvips
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):
+    PYVIPS_AVAILABLE = False
 
 from reports.report_utils import (
     ReportStyler, 
@@ -26,35 +47,462 @@ from reports.report_utils import (
 
 logger = logging.getLogger(__name__)
 
+# Payloads that are already compressed (images, video, PDF, Office/zip containers)
+# gain nothing from DEFLATE
+STORED_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic',
+    '.pdf', '.mp4', '.mov',
+    '.zip', '.gz', '.docx', '.xlsx',
+})
+
+# File extensions embedded as thumbnails on the Photos sheet
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+
+
+def _stat_file_sizes(paths, max_workers=32):
+    """Stat many paths concurrently (one round-trip each on network storage)
+    
+    Returns:
+        dict: {path: size in bytes, or None if the file is missing}
+    """
+    def file_size(path):
+        try:
+            return os.stat(path).st_size
+        except (OSError, TypeError, ValueError):
+            return None
+    
+    unique_paths = list(dict.fromkeys(path for path in paths if path))
+    if not unique_paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(unique_paths, executor.map(file_size, unique_paths)))
+
+
+# Friendly labels for the Files sheet, matched in order against the lowercased MIME type
+FILE_TYPE_LABELS = (
+    ('pdf', '📄 PDF Document'),
+    ('video', '🎥 Video'),
+    ('audio', '🔊 Audio'),
+    ('excel|spreadsheet', '📊 Spreadsheet'),
+    ('word|document', '📝 Document'),
+)
+
+
+def _file_type_labels(file_types):
+    """Map a Series of MIME types to display labels, falling back to the raw type"""
+    file_types = file_types.fillna('').astype(str)
+    lowered = file_types.str.lower()
+    return np.select(
+        [lowered.str.contains(pattern) for pattern, _ in FILE_TYPE_LABELS],
+        [label for _, label in FILE_TYPE_LABELS],
+        default=file_types
+    )
+
+
+def _format_file_sizes(sizes):
+    """Format a Series of byte counts as B/KB/MB strings; missing sizes show as '—'"""
+    sizes = pd.to_numeric(sizes, errors='coerce')
+    return np.select(
+        [sizes.isna(), sizes < 1024, sizes < 1024 * 1024],
+        [
+            '—',
+            sizes.round(0).astype('Int64').astype(str) + ' B',
+            (sizes / 1024).round(1).astype(str) + ' KB',
+        ],
+        default=(sizes / (1024 * 1024)).round(1).astype(str) + ' MB'
+    )
+
+
+def _format_upload_times(values, fmt='%Y-%m-%d %H:%M'):
+    """Format a Series of upload timestamps; unparseable values are kept as text"""
+    raw = values.fillna('').astype(str)
+    try:
+        parsed = pd.to_datetime(values, errors='coerce', format='mixed')
+    except (ValueError, TypeError):
+        # Mixed timezone offsets can't share one dtype - fall back to per-value parsing
+        parsed = values.map(lambda v: pd.to_datetime(v, errors='coerce'))
+        return [p.strftime(fmt) if pd.notna(p) else r for p, r in zip(parsed, raw)]
+    return parsed.dt.strftime(fmt).fillna(raw)
+
+
+@lru_cache(maxsize=1024)
+def _encode_thumbnail(file_path, max_width=140, max_height=100):
+    """Resize a photo to fit a Photos sheet cell and encode it
+    
+    Cached per path - stored uploads get a unique filename, so the same path
+    always holds the same photo and repeats across rows/reports skip the decode.
+    
+    Returns:
+        tuple: (encoded bytes, width, height) of the thumbnail
+    """
+    if PYVIPS_AVAILABLE:
+        try:
+            return _vips_thumbnail(file_path, max_width, max_height)
+        except pyvips.Error as e:
+            logger.debug(f"pyvips could not thumbnail {file_path}, using Pillow: {e}")
+    
+    # Close the file and free the decoded pixels as soon as the bytes are out
+    with PILImage.open(file_path) as img:
+        # JPEGs can decode straight to a smaller DCT scale before any pixel work
+        if img.format == 'JPEG':
+            bound = max(max_width, max_height) * 2
+            img.draft('RGB', (bound, bound))
+        
+        # Apply the EXIF rotation once so phone photos are upright
+        ImageOps.exif_transpose(img, in_place=True)
+        
+        # thumbnail() keeps the aspect ratio and does nothing for already-small images;
+        # reducing_gap pre-shrinks with a cheap box filter before the LANCZOS pass
+        img.thumbnail((max_width, max_height), PILImage.Resampling.LANCZOS, reducing_gap=2.0)
+        new_width, new_height = img.size
+        
+        # Thumbnails don't need lossless PNG - JPEG encodes far faster and smaller.
+        # Keep PNG only where transparency must survive, at the fastest zlib level.
+        has_alpha = img.mode in ('RGBA', 'LA') or 'transparency' in img.info
+        buf = BytesIO()
+        if has_alpha:
+            img.save(buf, 'PNG', compress_level=1, optimize=False)
+        else:
+            with img.convert('RGB') as rgb:
+                rgb.save(buf, 'JPEG', quality=85, optimize=False, progressive=False)
+    
+    return buf.getvalue(), new_width, new_height
+
+
+def _vips_thumbnail(file_path, max_width, max_height):
+    """pyvips version of the thumbnail - same bounds and encoding rules as Pillow"""
+    # thumbnail() picks a shrink-on-load scale, applies the EXIF rotation and
+    # streams the decode; size='down' leaves already-small photos alone
+    thumb = pyvips.Image.thumbnail(file_path, max_width, height=max_height, size='down')
+    if thumb.hasalpha():
+        data = thumb.pngsave_buffer(compression=1, strip=True)
+    else:
+        # Match Pillow's convert('RGB') for CMYK and other colour spaces
+        if thumb.interpretation not in ('srgb', 'b-w'):
+            thumb = thumb.colourspace('srgb')
+        data = thumb.jpegsave_buffer(Q=85, strip=True)
+    return data, thumb.width, thumb.height
+
+
+# Chunk/buffer size for ZIP package I/O - copying attachments in (zipfile.write
+# uses 8 KiB), writing the archive, and reading it back for the download
+ZIP_COPY_CHUNK = 1 << 20
+
+
+# Attachments up to this size are read ahead on worker threads; bigger ones
+# are streamed by the ZIP writer so memory stays bounded
+PREFETCH_MAX_BYTES = 16 << 20
+PREFETCH_WORKERS = 8
+# Total size of read-ahead attachments held in memory at once, per package
+PREFETCH_WINDOW_BYTES = 64 << 20
+
+
+def _zip_info(source_path, arcname):
+    """ZipInfo for a file on disk (or, with no source_path, new data stamped now),
+    with the compression type chosen for its type
+    
+    The level is not carried by the ZipInfo (ZipInfo.compress_level is only
+    public from Python 3.13) - pass it to writestr()/write() instead.
+    """
+    if source_path is None:
+        zinfo = zipfile.ZipInfo(arcname, time.localtime()[:6])
+    else:
+        zinfo = zipfile.ZipInfo.from_file(source_path, arcname)
+    zinfo.compress_type = _zip_compression(arcname)[0]
+    return zinfo
+
+
+def _zip_copy(zipf, source_path, arcname):
+    """Stream a file on disk into the archive
+    
+    Stored entries are copied in 1 MiB chunks; deflated ones go through
+    zipf.write(), the streaming path that honours compresslevel on every Python.
+    """
+    compress_type, compresslevel = _zip_compression(arcname)
+    if compresslevel is not None:
+        zipf.write(source_path, arcname, compress_type, compresslevel)
+        return
+    zinfo = _zip_info(source_path, arcname)
+    with open(source_path, 'rb', buffering=ZIP_COPY_CHUNK) as src, zipf.open(zinfo, 'w') as sink:
+        shutil.copyfileobj(src, sink, ZIP_COPY_CHUNK)
+
+
+def _read_ahead(executor, fn, items, window, max_bytes, size_of):
+    """Like executor.map, but with at most ``window`` calls and ``max_bytes``
+    (as measured by ``size_of``) of results in flight
+    
+    Yields futures in input order so each failure can be handled per item.
+    """
+    pending = deque()
+    in_flight = 0
+    for item in items:
+        size = size_of(item)
+        while pending and (len(pending) >= window or in_flight + size > max_bytes):
+            done_size, future = pending.popleft()
+            in_flight -= done_size
+            yield future
+        pending.append((size, executor.submit(fn, item)))
+        in_flight += size
+    while pending:
+        yield pending.popleft()[1]
+
+
+def _zip_compression(filename):
+    """Return (compress_type, compresslevel) for a ZIP entry based on its extension"""
+    if os.path.splitext(filename)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED, None
+    return zipfile.ZIP_DEFLATED, 1
+
 
 class BuilderReportGenerator:
     """Generate comprehensive defect management reports for builders"""
     
+    # Whitelisted status filters - callers pass a key; the statuses are bound as parameters
+    STATUS_FILTERS = {
+        'active': ('NOT IN', ('pending',)),
+        'non_pending': ('IN', ('in_progress', 'waiting_approval', 'approved')),
+        'pending': ('IN', ('pending',)),
+    }
+    
+    # Report queries keyed by name: (base SELECT, inspection clause, ORDER BY)
+    QUERIES = {
+        'work_orders': ("""
+                SELECT 
+                    wo.id as work_order_number,
+                    wo.unit,
+                    wo.trade,
+                    wo.component,
+                    wo.room,
+                    wo.urgency as priority,
+                    wo.status,
+                    wo.assigned_to,
+                    wo.notes as description,
+                    wo.created_at,
+                    wo.updated_at,
+                    wo.planned_date as due_date,
+                    wo.started_date,
+                    wo.completed_date as completed_at,
+                    wo.builder_notes,
+                    i.inspection_date,
+                    b.name as building_name
+                FROM inspector_work_orders wo
+                LEFT JOIN inspector_inspections i ON wo.inspection_id = i.id
+                LEFT JOIN inspector_buildings b ON i.building_id = b.id
+                WHERE 1=1
+            """, " AND wo.inspection_id = ?", """
+                ORDER BY 
+                    CASE wo.status 
+                        WHEN 'pending' THEN 1 
+                        WHEN 'in_progress' THEN 2 
+                        WHEN 'waiting_approval' THEN 3 
+                        WHEN 'approved' THEN 4 
+                        ELSE 5 
+                    END,
+                    wo.updated_at DESC
+            """),
+        'defects': ("""
+                SELECT 
+                    id,
+                    inspection_id,
+                    unit,
+                    unit_type,
+                    room,
+                    component,
+                    trade,
+                    status_class as status,
+                    urgency,
+                    planned_completion,
+                    created_at
+                FROM inspector_inspection_items
+                WHERE status_class = 'Not OK'
+            """, " AND inspection_id = ?", ""),
+        'package_files': ("""
+                SELECT 
+                    wof.work_order_id,
+                    wof.original_filename,
+                    wof.file_path,
+                    wof.file_type
+                FROM work_order_files wof
+                INNER JOIN inspector_work_orders wo ON wof.work_order_id = wo.id
+                WHERE 1=1
+            """, " AND wo.inspection_id = ?", ""),
+        'work_order_exists': ("""
+                SELECT 1
+                FROM inspector_work_orders wo
+                WHERE 1=1
+            """, " AND wo.inspection_id = ?", " LIMIT 1"),
+    }
+    
+    # Fully built SQL strings keyed by (query name, filter shape)
+    _sql_cache = {}
+    
+    # SELECT ... FROM for each attachments table layout, in order of preference
+    ATTACHMENT_SOURCES = {
+        'work_order_files': """
+                SELECT 
+                    wof.work_order_id,
+                    wof.original_filename,
+                    wof.file_path,
+                    wof.file_type,
+                    wof.uploaded_at,
+                    wo.unit,
+                    wo.room,
+                    wo.component,
+                    wo.trade,
+                    wo.status
+                FROM work_order_files wof
+                LEFT JOIN inspector_work_orders wo ON wof.work_order_id = wo.id
+            """,
+        'inspector_work_order_files': """
+                SELECT 
+                    wof.work_order_id,
+                    wof.original_filename,
+                    wof.file_path,
+                    wof.file_type,
+                    wof.uploaded_at
+                FROM inspector_work_order_files wof
+            """,
+    }
+    
+    # Attachments table found by the schema probe, keyed by database path
+    _attachment_tables = {}
+    
+    HEADER_STYLE_NAME = 'wo_header'
+    
     def __init__(self, db_manager):
         self.db_manager = db_manager
         self.db_path = db_manager.db_path if hasattr(db_manager, 'db_path') else "building_inspection.db"
         self.styler = ReportStyler()
         self.processor = ReportDataProcessor()
     
-    def _get_fresh_connection(self):
-        """Always get a fresh database connection"""
-        return sqlite3.connect(self.db_path, check_same_thread=False, detect_types=0)
+    def _get_readonly_connection(self):
+        """Open one read-only handle to share across every query of a report.
+        
+        Reports never write, so the handle is opened with mode=ro and query_only,
+        and the database pages are memory-mapped instead of read() per page.
+        """
+        # as_uri() percent-escapes '?', '#' and '%' so they stay part of the path
+        db_uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        conn = sqlite3.connect(db_uri, uri=True,
+                               check_same_thread=False, detect_types=0,
+                               cached_statements=256)
+        conn.execute("PRAGMA query_only = 1")
+        conn.execute("PRAGMA mmap_size = 1073741824")
+        conn.execute("PRAGMA cache_size = -65536")
+        return conn
     
-    def generate_excel_report(self, builder_name=None, inspection_id=None, include_photos=False, status_filter=None, include_files_sheet=False):
+    def _check_status_filter(self, status_filter):
+        """Reject anything but a STATUS_FILTERS key, rather than report every status"""
+        if status_filter and status_filter not in self.STATUS_FILTERS:
+            raise ValueError(f"Unknown status filter: {status_filter!r} "
+                             f"(expected one of {sorted(self.STATUS_FILTERS)})")
+    
+    def _build_query(self, sql_key, by_inspection=False, status_filter=None):
+        """Return the SQL for a named query and filter shape.
+        
+        Identical shapes always produce the identical string, so sqlite's
+        statement cache can reuse the prepared plan.
+        """
+        self._check_status_filter(status_filter)
+        
+        shape = (sql_key, bool(by_inspection), status_filter)
+        sql = self._sql_cache.get(shape)
+        if sql is None:
+            base, inspection_clause, order_by = self.QUERIES[sql_key]
+            sql = base
+            if by_inspection:
+                sql += inspection_clause
+            if status_filter:
+                operator, statuses = self.STATUS_FILTERS[status_filter]
+                placeholders = ', '.join('?' * len(statuses))
+                sql += f" AND wo.status {operator} ({placeholders})"
+            sql += order_by
+            self._sql_cache[shape] = sql
+        return sql
+    
+    def _run_query(self, conn, sql_key, inspection_id=None, status_filter=None):
+        """Run a named report query with bound parameters"""
+        sql = self._build_query(sql_key, bool(inspection_id), status_filter)
+        params = [inspection_id] if inspection_id else []
+        if status_filter in self.STATUS_FILTERS:
+            params.extend(self.STATUS_FILTERS[status_filter][1])
+        return pd.read_sql_query(sql, conn, params=params or None)
+    
+    def _attachments_table(self, conn):
+        """Probe the schema once per database for the table holding work order files"""
+        table = self._attachment_tables.get(self.db_path)
+        if table is None:
+            for name in self.ATTACHMENT_SOURCES:
+                if conn.execute(f"PRAGMA table_info({name})").fetchall():
+                    table = name
+                    # Only a hit is remembered - the table may be created later
+                    self._attachment_tables[self.db_path] = table
+                    break
+        return table
+    
+    def _get_attachments(self, conn, images=None):
+        """Fetch image, non-image (or, with images=None, all typed) attachments, newest first"""
+        try:
+            table = self._attachments_table(conn)
+            if table is None:
+                logger.error("No work order files table found")
+                return pd.DataFrame()
+            
+            if images is None:
+                # Same rows as the LIKE / NOT LIKE pair together - both skip NULL types
+                condition = "wof.file_type IS NOT NULL"
+            else:
+                match = "LIKE" if images else "NOT LIKE"
+                condition = f"wof.file_type {match} 'image%'"
+            sql = (f"{self.ATTACHMENT_SOURCES[table]}"
+                   f" WHERE {condition}"
+                   " ORDER BY wof.uploaded_at DESC")
+            return pd.read_sql_query(sql, conn)
+            
+        except Exception as e:
+            logger.error(f"Could not query work order files: {e}")
+            return pd.DataFrame()
+    
+    def _ensure_header_style(self, wb):
+        """Register the shared column-header NamedStyle on the workbook once and return its name"""
+        if self.HEADER_STYLE_NAME not in wb.style_names:
+            wb.add_named_style(NamedStyle(
+                name=self.HEADER_STYLE_NAME,
+                font=Font(bold=True, size=11),
+                fill=PatternFill(start_color=self.styler.HEADER_COLOR,
+                                 end_color=self.styler.HEADER_COLOR,
+                                 fill_type="solid"),
+                alignment=Alignment(horizontal='center', vertical='center')
+            ))
+        return self.HEADER_STYLE_NAME
+    
+    def generate_excel_report(self, builder_name=None, inspection_id=None, include_photos=False, status_filter=None, include_files_sheet=False, conn=None, output=None, raise_errors=False):
         """Generate Excel report with multiple sheets
         
         Args:
+            status_filter: Optional STATUS_FILTERS key; any other value raises ValueError.
             include_files_sheet: If True, include the Files sheet (for ZIP packages).
                                  If False, skip Files sheet (for standalone Excel downloads).
+            conn: Optional read-only connection to reuse. If omitted, one is
+                  opened for this report and closed when it is done.
+            output: Optional writable binary stream to save the workbook into.
+                    If omitted, a BytesIO is returned, rewound for reading.
+            raise_errors: If True, failures raise instead of being shown with
+                          st.warning/st.error - for callers off the script thread.
         """
-        conn = None
-        temp_files = []  # Track temp files to clean up
+        self._check_status_filter(status_filter)
+        owns_conn = conn is None
         try:
-            # Fetch data with fresh connections
-            work_orders_df = self._get_work_orders(builder_name, inspection_id, status_filter)
-            defects_df = self._get_defects(inspection_id)
+            if owns_conn:
+                conn = self._get_readonly_connection()
+            
+            # Every query of this report shares the one read-only handle
+            work_orders_df = self._get_work_orders(conn, builder_name, inspection_id, status_filter)
+            defects_df = self._get_defects(conn, inspection_id)
             
             if work_orders_df.empty:
+                if raise_errors:
+                    raise ValueError("No work orders found for the selected criteria")
                 st.warning("⚠️ No work orders found for the selected criteria")
                 return None
             
@@ -63,6 +511,7 @@ class BuilderReportGenerator:
             # Create workbook
             wb = Workbook()
             wb.remove(wb.active)
+            self._ensure_header_style(wb)
             
             # Add metadata sheet
             metadata_info = {
@@ -83,112 +532,57 @@ class BuilderReportGenerator:
             self._create_progress_sheet(wb, work_orders_df)
             
             if include_photos:
-                temp_files = self._create_photos_sheet(wb, defects_df)
+                # One attachments query feeds both the Photos and Files sheets
+                attachments_df = self._get_attachments(conn, images=None if include_files_sheet else True)
+                if attachments_df.empty:
+                    is_image = pd.Series(dtype=bool)
+                else:
+                    # Matches SQLite's case-insensitive LIKE 'image%'
+                    is_image = attachments_df['file_type'].str.lower().str.startswith('image')
+                
+                self._create_photos_sheet(wb, attachments_df[is_image], defects_df)
                 # Only include Files sheet if explicitly requested (for ZIP packages)
                 if include_files_sheet:
-                    self._create_files_sheet(wb, defects_df)
-            
-            # Save to BytesIO
-            output = BytesIO()
-            wb.save(output)
-            output.seek(0)
+                    self._create_files_sheet(wb, attachments_df[~is_image], defects_df)
             
-            # ✅ NOW clean up temp files AFTER workbook is saved
-            for temp_file in temp_files:
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                        logger.info(f"🧹 Cleaned up temp file: {temp_file}")
-                except Exception as e:
-                    logger.warning(f"Could not delete temp file {temp_file}: {e}")
+            # Save to the caller's stream, or to BytesIO
+            if output is None:
+                output = BytesIO()
+                wb.save(output)
+                output.seek(0)
+            else:
+                wb.save(output)
             
             logger.info("✅ Excel report generated successfully")
             return output
             
         except Exception as e:
             logger.error(f"❌ Error generating Excel report: {e}")
-            st.error(f"Error generating report: {e}")
             import traceback
             logger.error(traceback.format_exc())
-            
-            # Clean up temp files even on error
-            for temp_file in temp_files:
-                try:
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
-                except:
-                    pass
-            
+            if raise_errors:
+                raise
+            st.error(f"Error generating report: {e}")
             return None
         finally:
-            if conn:
+            if owns_conn and conn:
                 try:
                     conn.close()
                 except:
                     pass
     
-    def _get_work_orders(self, builder_name=None, inspection_id=None, status_filter=None):
-        """Fetch work orders - uses fresh connection with CORRECT column names"""
-        conn = None
+    def _get_work_orders(self, conn, builder_name=None, inspection_id=None, status_filter=None):
+        """Fetch work orders - uses the report's shared connection with CORRECT column names"""
         try:
-            conn = self._get_fresh_connection()
-            
-            # Use ACTUAL column names from inspector_work_orders table
-            query = """
-                SELECT 
-                    wo.id,
-                    wo.id as work_order_number,
-                    wo.unit,
-                    wo.trade,
-                    wo.component,
-                    wo.room,
-                    wo.urgency as priority,
-                    wo.status,
-                    wo.assigned_to,
-                    wo.notes as description,
-                    wo.created_at,
-                    wo.updated_at,
-                    wo.planned_date as due_date,
-                    wo.started_date,
-                    wo.completed_date as completed_at,
-                    wo.builder_notes,
-                    wo.notes,
-                    i.inspection_date,
-                    b.name as building_name
-                FROM inspector_work_orders wo
-                LEFT JOIN inspector_inspections i ON wo.inspection_id = i.id
-                LEFT JOIN inspector_buildings b ON i.building_id = b.id
-                WHERE 1=1
-            """
-            
-            params = []
-            
-            if inspection_id:
-                query += " AND wo.inspection_id = ?"
-                params.append(inspection_id)
-            
-            # Add status filter if provided
             if status_filter:
-                query += f" AND {status_filter}"
                 logger.info(f"Applying status filter: {status_filter}")
             
-            # Order by status priority, then by date
-            query += """
-                ORDER BY 
-                    CASE wo.status 
-                        WHEN 'pending' THEN 1 
-                        WHEN 'in_progress' THEN 2 
-                        WHEN 'waiting_approval' THEN 3 
-                        WHEN 'approved' THEN 4 
-                        ELSE 5 
-                    END,
-                    wo.updated_at DESC
-            """
-            
-            logger.info(f"Executing query with params: {params}")
-            df = pd.read_sql_query(query, conn, params=params if params else None)
+            df = self._run_query(conn, 'work_orders', inspection_id, status_filter)
             logger.info(f"Query returned {len(df)} rows")
             
+            # wo.id is selected once; expose it under both names for downstream sheets
+            df['id'] = df['work_order_number']
+            
             # Create a better title from unit + room + component
             if 'unit' in df.columns and 'room' in df.columns and 'component' in df.columns:
                 df['title'] = df.apply(
@@ -201,53 +595,16 @@ class BuilderReportGenerator:
         except Exception as e:
             logger.error(f"Error fetching work orders: {e}")
             return pd.DataFrame()
-        finally:
-            if conn:
-                try:
-                    conn.close()
-                except:
-                    pass
     
-    def _get_defects(self, inspection_id=None):
-        """Fetch defects - uses fresh connection"""
-        conn = None
+    def _get_defects(self, conn, inspection_id=None):
+        """Fetch defects - uses the report's shared connection"""
         try:
-            conn = self._get_fresh_connection()
-            
-            query = """
-                SELECT 
-                    id,
-                    inspection_id,
-                    unit,
-                    unit_type,
-                    room,
-                    component,
-                    trade,
-                    status_class as status,
-                    urgency,
-                    planned_completion,
-                    created_at
-                FROM inspector_inspection_items
-                WHERE status_class = 'Not OK'
-            """
-            
-            params = []
-            if inspection_id:
-                query += " AND inspection_id = ?"
-                params.append(inspection_id)
-            
-            df = pd.read_sql_query(query, conn, params=params if params else None)
+            df = self._run_query(conn, 'defects', inspection_id)
             return df
             
         except Exception as e:
             logger.error(f"Error fetching defects: {e}")
             return pd.DataFrame()
-        finally:
-            if conn:
-                try:
-                    conn.close()
-                except:
-                    pass
     
     def _create_summary_sheet(self, wb, work_orders_df, defects_df):
         """Create executive summary sheet - FIXED STATUS VALUES"""
@@ -265,9 +622,19 @@ class BuilderReportGenerator:
         completion_rate = self.processor.calculate_completion_rate(approved, total_wo)
         
         total_defects = len(defects_df)
-        urgent = len(defects_df[defects_df['urgency'] == 'Urgent']) if len(defects_df) > 0 else 0
-        high_priority = len(defects_df[defects_df['urgency'] == 'High Priority']) if len(defects_df) > 0 else 0
-        
+
+        # Count each column once and derive every defect stat from the small count Series;
+        # sort_index() makes idxmax() break ties on the smallest value, as mode()/groupby() did
+        if total_defects > 0:
+            vc_unit = defects_df['unit'].value_counts().sort_index()
+            vc_urg = defects_df['urgency'].value_counts()
+            vc_trade = defects_df['trade'].value_counts().sort_index()
+            urgent = int(vc_urg.get('Urgent', 0))
+            high_priority = int(vc_urg.get('High Priority', 0))
+        else:
+            urgent = 0
+            high_priority = 0
+
         summary_data = {
             'Total Work Orders': total_wo,
             'Pending Work Orders': pending,
@@ -282,12 +649,11 @@ class BuilderReportGenerator:
             'Normal Priority': total_defects - urgent - high_priority,
         }
         
-        if len(defects_df) > 0:
+        if total_defects > 0:
             summary_data[''] = ''
-            most_common_trade = defects_df['trade'].mode()
-            summary_data['Most Common Trade'] = most_common_trade[0] if len(most_common_trade) > 0 else 'N/A'
-            summary_data['Unit with Most Defects'] = defects_df.groupby('unit').size().idxmax()
-            summary_data['Avg Defects per Unit'] = f"{len(defects_df) / defects_df['unit'].nunique():.1f}"
+            summary_data['Most Common Trade'] = vc_trade.idxmax() if vc_trade.size > 0 else 'N/A'
+            summary_data['Unit with Most Defects'] = vc_unit.idxmax()
+            summary_data['Avg Defects per Unit'] = f"{total_defects / vc_unit.size:.1f}"
         
         summary_df = create_summary_dataframe(summary_data)
         
@@ -472,11 +838,8 @@ class BuilderReportGenerator:
         
         self.styler.style_header_row(ws, row=1)
         self.styler.auto_adjust_column_width(ws)
-        
-        # Set row height to auto-fit wrapped text
-        for row_idx in range(2, ws.max_row + 1):
-            ws.row_dimensions[row_idx].height = None  # Auto-height
-    
+        # Row heights are left unset so Excel auto-fits the wrapped notes
+
     def _create_by_trade_sheet(self, wb, defects_df):
         """Create defects by trade sheet"""
         ws = wb.create_sheet("🔧 By Trade")
@@ -560,59 +923,19 @@ class BuilderReportGenerator:
         self.styler.style_header_row(ws, row=1)
         self.styler.auto_adjust_column_width(ws)
     
-    def _create_photos_sheet(self, wb, defects_df):
+    def _create_photos_sheet(self, wb, photos_df, defects_df):
         """Create photo references sheet with embedded images"""
         ws = wb.create_sheet("📷 Photos")
         
-        # Get all work order files from database
-        conn = None
         try:
-            conn = self._get_fresh_connection()
-            
-            # Try to get ONLY IMAGE files from work_order_files table
-            try:
-                photos_df = pd.read_sql_query("""
-                    SELECT 
-                        wof.work_order_id,
-                        wof.original_filename,
-                        wof.file_path,
-                        wof.file_type,
-                        wof.uploaded_at,
-                        wo.unit,
-                        wo.room,
-                        wo.component,
-                        wo.trade,
-                        wo.status
-                    FROM work_order_files wof
-                    LEFT JOIN inspector_work_orders wo ON wof.work_order_id = wo.id
-                    WHERE wof.file_type LIKE 'image%'
-                    ORDER BY wof.uploaded_at DESC
-                """, conn)
-                logger.info(f"Found {len(photos_df)} image files")
-            except:
-                # Try alternative table name
-                try:
-                    photos_df = pd.read_sql_query("""
-                        SELECT 
-                            wof.work_order_id,
-                            wof.original_filename,
-                            wof.file_path,
-                            wof.file_type,
-                            wof.uploaded_at
-                        FROM inspector_work_order_files wof
-                        WHERE wof.file_type LIKE 'image%'
-                        ORDER BY wof.uploaded_at DESC
-                    """, conn)
-                except Exception as e:
-                    logger.error(f"Could not query photos: {e}")
-                    photos_df = pd.DataFrame()
+            logger.info(f"Found {len(photos_df)} image files")
             
             if photos_df.empty:
                 ws['A1'] = '📷 No photos found in the system'
                 ws['A1'].font = Font(bold=True, size=12)
                 ws['A3'] = 'Photos will appear here once builders upload them with their work orders.'
                 ws['A4'] = 'Note: This sheet only shows image files (JPG, PNG, etc.)'
-                return []
+                return
             
             # Create header
             ws['A1'] = '📷 PHOTO REFERENCES'
@@ -626,13 +949,10 @@ class BuilderReportGenerator:
             
             # Column headers (row 2)
             headers = ['Preview', 'Work Order', 'Filename', 'Unit', 'Room', 'Component', 'Trade']
-            for c_idx, header in enumerate(headers, start=1):
-                cell = ws.cell(row=2, column=c_idx, value=header)
-                cell.font = Font(bold=True, size=11)
-                cell.fill = PatternFill(start_color=self.styler.HEADER_COLOR, 
-                                       end_color=self.styler.HEADER_COLOR, 
-                                       fill_type="solid")
-                cell.alignment = Alignment(horizontal='center', vertical='center')
+            header_style = self._ensure_header_style(wb)
+            ws.append(headers)
+            for cell in ws[2]:
+                cell.style = header_style
             
             ws.row_dimensions[2].height = 20  # Header row height
             
@@ -645,24 +965,39 @@ class BuilderReportGenerator:
             ws.column_dimensions['F'].width = 20  # Component
             ws.column_dimensions['G'].width = 20  # Trade
             
+            # Resize + encode every photo up front on a thread pool (Pillow's C core
+            # releases the GIL), then add the images serially - openpyxl isn't thread safe
+            def prepare(file_path):
+                if not (file_path and file_path.lower().endswith(IMAGE_EXTENSIONS)):
+                    return None
+                try:
+                    return _encode_thumbnail(file_path)
+                except Exception as e:
+                    return e
+            
+            # Each distinct photo is decoded once even if several rows point at it
+            unique_paths = photos_df['file_path'].unique()
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                thumbnails = dict(zip(unique_paths, executor.map(prepare, unique_paths)))
+            file_sizes = _stat_file_sizes(photos_df['file_path'])
+            
             # Add data rows with images
             current_row = 3  # Start at row 3 (after title row 1 and header row 2)
             images_added = 0
             images_failed = 0
-            temp_files = []  # Track temp files to clean up later
+            
+            # Size every data row in one pass: taller rows for images (in points,
+            # not pixels), normal height for anything else
+            is_image = photos_df['file_path'].fillna('').str.lower().str.endswith(IMAGE_EXTENSIONS)
+            row_heights = np.where(is_image, 80, 20)
+            ws.row_dimensions.update({
+                r: RowDimension(ws, index=r, ht=int(h))
+                for r, h in enumerate(row_heights, start=current_row)
+            })
             
             for idx, row in photos_df.iterrows():
                 file_path = row.get('file_path', '')
-                
-                # Determine row height based on whether it's an image
-                is_image = file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')) if file_path else False
-                
-                if is_image:
-                    # Set taller row height for images (in points, not pixels)
-                    ws.row_dimensions[current_row].height = 80
-                else:
-                    # Normal row height for non-images
-                    ws.row_dimensions[current_row].height = 20
+                thumbnail = thumbnails.get(file_path)
                 
                 # Add text data
                 ws.cell(row=current_row, column=2, value=row.get('work_order_id', ''))
@@ -673,55 +1008,30 @@ class BuilderReportGenerator:
                 ws.cell(row=current_row, column=7, value=row.get('trade', ''))
                 
                 # Try to embed the image or show info for non-images
-                if file_path and os.path.exists(file_path):
-                    try:
-                        # Check if it's actually an image file
-                        if file_path.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-                            # Load image and get original dimensions
-                            img = PILImage.open(file_path)
-                            original_width = img.width
-                            original_height = img.height
-                            
-                            # Target dimensions to fit nicely in Excel cell
-                            max_height_pixels = 100  # Fit within row with padding
-                            max_width_pixels = 140   # Fit within column with padding
-                            
-                            # Calculate scale to fit within constraints (maintain aspect ratio)
-                            scale_height = max_height_pixels / original_height if original_height > max_height_pixels else 1
-                            scale_width = max_width_pixels / original_width if original_width > max_width_pixels else 1
-                            scale = min(scale_height, scale_width)
-                            
-                            # Always resize to ensure consistent sizing
-                            new_width = int(original_width * scale)
-                            new_height = int(original_height * scale)
-                            img = img.resize((new_width, new_height), PILImage.Resampling.LANCZOS)
-                            
-                            # Use proper temporary directory
-                            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                                temp_path = tmp.name
-                                img.save(temp_path, 'PNG')
-                            
-                            # Track temp file for cleanup after workbook is saved
-                            temp_files.append(temp_path)
-                            
-                            # Add to Excel with proper positioning
-                            xl_img = XLImage(temp_path)
-                            xl_img.anchor = f'A{current_row}'
-                            ws.add_image(xl_img)
-                            
-                            images_added += 1
-                            logger.info(f"✅ Embedded image: {file_path} (resized to {new_width}x{new_height})")
-                        else:
-                            # Should not happen since we filter for images only in SQL
-                            cell = ws.cell(row=current_row, column=1, value="[Not an image]")
-                            cell.font = Font(color="999999", italic=True)
-                            logger.warning(f"Non-image file in photos sheet: {file_path}")
-                            
-                    except Exception as e:
-                        logger.warning(f"Could not embed image {file_path}: {e}")
+                if file_sizes.get(file_path) is not None:
+                    if isinstance(thumbnail, Exception):
+                        logger.warning(f"Could not embed image {file_path}: {thumbnail}")
                         cell = ws.cell(row=current_row, column=1, value=f"[Error loading]")
                         cell.font = Font(color="FF6600")
                         images_failed += 1
+                    elif thumbnail is not None:
+                        thumb_bytes, new_width, new_height = thumbnail
+                        
+                        # Fresh buffer per row - openpyxl closes it when the workbook is saved
+                        xl_img = XLImage(BytesIO(thumb_bytes))
+                        xl_img.anchor = OneCellAnchor(
+                            _from=AnchorMarker(col=0, row=current_row - 1),
+                            ext=XDRPositiveSize2D(pixels_to_EMU(xl_img.width), pixels_to_EMU(xl_img.height))
+                        )
+                        ws.add_image(xl_img)
+                        
+                        images_added += 1
+                        logger.info(f"✅ Embedded image: {file_path} (resized to {new_width}x{new_height})")
+                    else:
+                        # Should not happen since we filter for images only in SQL
+                        cell = ws.cell(row=current_row, column=1, value="[Not an image]")
+                        cell.font = Font(color="999999", italic=True)
+                        logger.warning(f"Non-image file in photos sheet: {file_path}")
                 else:
                     cell = ws.cell(row=current_row, column=1, value="[File not found]")
                     cell.font = Font(color="FF0000")
@@ -742,9 +1052,6 @@ class BuilderReportGenerator:
             
             logger.info(f"✅ Photos sheet created: {images_added} embedded, {images_failed} failed")
             
-            # Return list of temp files to be cleaned up after workbook is saved
-            return temp_files
-            
         except Exception as e:
             logger.error(f"Error creating photos sheet: {e}")
             import traceback
@@ -752,85 +1059,13 @@ class BuilderReportGenerator:
             ws['A1'] = 'Error loading photo information'
             ws['A1'].font = Font(bold=True, size=12, color="FF0000")
             ws['A3'] = f'Error: {str(e)}'
-            return []  # Return empty list on error
-        finally:
-            if conn:
-                try:
-                    conn.close()
-                except:
-                    pass
     
-    def _create_files_sheet(self, wb, defects_df):
+    def _create_files_sheet(self, wb, files_df, defects_df):
         """Create a sheet listing all non-image file attachments"""
         ws = wb.create_sheet("📎 Files")
         
-        conn = None
         try:
-            conn = self._get_fresh_connection()
-            
-            # Get all NON-IMAGE files from work_order_files table
-            try:
-                # First, try with all columns including file_size
-                files_df = pd.read_sql_query("""
-                    SELECT 
-                        wof.work_order_id,
-                        wof.original_filename,
-                        wof.file_path,
-                        wof.file_type,
-                        wof.uploaded_at,
-                        wo.unit,
-                        wo.room,
-                        wo.component,
-                        wo.trade,
-                        wo.status
-                    FROM work_order_files wof
-                    LEFT JOIN inspector_work_orders wo ON wof.work_order_id = wo.id
-                    WHERE wof.file_type NOT LIKE 'image%'
-                    ORDER BY wof.uploaded_at DESC
-                """, conn)
-                logger.info(f"Found {len(files_df)} non-image files")
-            except Exception as e1:
-                logger.warning(f"First query failed: {e1}, trying alternative...")
-                # Try alternative table name
-                try:
-                    files_df = pd.read_sql_query("""
-                        SELECT 
-                            wof.work_order_id,
-                            wof.original_filename,
-                            wof.file_path,
-                            wof.file_type,
-                            wof.uploaded_at
-                        FROM inspector_work_order_files wof
-                        WHERE wof.file_type NOT LIKE 'image%'
-                        ORDER BY wof.uploaded_at DESC
-                    """, conn)
-                    logger.info(f"Alternative query: Found {len(files_df)} non-image files")
-                except Exception as e2:
-                    logger.error(f"Both queries failed: {e2}")
-                    # Last resort: get ALL files and filter in Python
-                    try:
-                        files_df = pd.read_sql_query("""
-                            SELECT 
-                                wof.work_order_id,
-                                wof.original_filename,
-                                wof.file_path,
-                                wof.file_type,
-                                wof.uploaded_at,
-                                wo.unit,
-                                wo.room,
-                                wo.component,
-                                wo.trade,
-                                wo.status
-                            FROM work_order_files wof
-                            LEFT JOIN inspector_work_orders wo ON wof.work_order_id = wo.id
-                            ORDER BY wof.uploaded_at DESC
-                        """, conn)
-                        # Filter out images in Python
-                        files_df = files_df[~files_df['file_type'].str.contains('image', case=False, na=False)]
-                        logger.info(f"Fallback query: Found {len(files_df)} non-image files after filtering")
-                    except Exception as e3:
-                        logger.error(f"All queries failed: {e3}")
-                        files_df = pd.DataFrame()
+            logger.info(f"Found {len(files_df)} non-image files")
             
             # DEBUG: Show what we found
             if not files_df.empty:
@@ -858,13 +1093,10 @@ class BuilderReportGenerator:
             
             # Column headers (row 2)
             headers = ['Work Order', 'Filename', 'Type', 'Size', 'Uploaded', 'Unit', 'Room', 'Component', 'Trade', 'File Path']
-            for c_idx, header in enumerate(headers, start=1):
-                cell = ws.cell(row=2, column=c_idx, value=header)
-                cell.font = Font(bold=True, size=11)
-                cell.fill = PatternFill(start_color=self.styler.HEADER_COLOR, 
-                                       end_color=self.styler.HEADER_COLOR, 
-                                       fill_type="solid")
-                cell.alignment = Alignment(horizontal='center', vertical='center')
+            header_style = self._ensure_header_style(wb)
+            ws.append(headers)
+            for cell in ws[2]:
+                cell.style = header_style
             
             ws.row_dimensions[2].height = 20
             
@@ -880,80 +1112,31 @@ class BuilderReportGenerator:
             ws.column_dimensions['I'].width = 20  # Trade
             ws.column_dimensions['J'].width = 60  # File Path
             
-            # Add data rows
+            # Derive the display columns once for the whole frame
+            if 'file_size' in files_df.columns:
+                sizes = pd.to_numeric(files_df['file_size'], errors='coerce')
+                sizes = sizes.where(sizes > 0)  # Zero/unknown sizes show as '—'
+            else:
+                # Stat every file up front when the table has no file_size column
+                file_sizes = _stat_file_sizes(files_df['file_path'])
+                sizes = files_df['file_path'].map(file_sizes)
+            files_df = files_df.assign(
+                type_display=_file_type_labels(files_df['file_type']),
+                size_display=_format_file_sizes(sizes),
+                uploaded_display=_format_upload_times(files_df['uploaded_at'])
+            )
+            
+            # Add data rows, one append per row straight from plain tuples
+            # (columns the legacy files table lacks come through blank)
+            records = files_df.reindex(columns=[
+                'work_order_id', 'original_filename', 'type_display', 'size_display',
+                'uploaded_display', 'unit', 'room', 'component', 'trade', 'file_path'
+            ], fill_value='').itertuples(index=False, name=None)
+            path_font = Font(size=9, color="0000FF")  # Blue, smaller font for the file path
             current_row = 3
-            for idx, row in files_df.iterrows():
-                ws.cell(row=current_row, column=1, value=row.get('work_order_id', ''))
-                ws.cell(row=current_row, column=2, value=row.get('original_filename', ''))
-                
-                # Format file type nicely
-                file_type = row.get('file_type', '')
-                if 'pdf' in file_type.lower():
-                    file_type_display = '📄 PDF Document'
-                elif 'video' in file_type.lower():
-                    file_type_display = '🎥 Video'
-                elif 'audio' in file_type.lower():
-                    file_type_display = '🔊 Audio'
-                elif 'excel' in file_type.lower() or 'spreadsheet' in file_type.lower():
-                    file_type_display = '📊 Spreadsheet'
-                elif 'word' in file_type.lower() or 'document' in file_type.lower():
-                    file_type_display = '📝 Document'
-                else:
-                    file_type_display = file_type
-                ws.cell(row=current_row, column=3, value=file_type_display)
-                
-                # Format file size - check if column exists
-                if 'file_size' in files_df.columns:
-                    file_size = row.get('file_size', 0)
-                    if file_size:
-                        if file_size < 1024:
-                            size_display = f"{file_size} B"
-                        elif file_size < 1024 * 1024:
-                            size_display = f"{file_size / 1024:.1f} KB"
-                        else:
-                            size_display = f"{file_size / (1024 * 1024):.1f} MB"
-                    else:
-                        size_display = "—"
-                else:
-                    # Try to get file size from file path
-                    file_path = row.get('file_path', '')
-                    if file_path and os.path.exists(file_path):
-                        try:
-                            file_size = os.path.getsize(file_path)
-                            if file_size < 1024:
-                                size_display = f"{file_size} B"
-                            elif file_size < 1024 * 1024:
-                                size_display = f"{file_size / 1024:.1f} KB"
-                            else:
-                                size_display = f"{file_size / (1024 * 1024):.1f} MB"
-                        except:
-                            size_display = "—"
-                    else:
-                        size_display = "—"
-                
-                ws.cell(row=current_row, column=4, value=size_display)
-                
-                # Format uploaded date
-                uploaded = row.get('uploaded_at', '')
-                if uploaded:
-                    try:
-                        uploaded_dt = pd.to_datetime(uploaded)
-                        uploaded_display = uploaded_dt.strftime('%Y-%m-%d %H:%M')
-                    except:
-                        uploaded_display = str(uploaded)
-                else:
-                    uploaded_display = ""
-                ws.cell(row=current_row, column=5, value=uploaded_display)
-                
-                ws.cell(row=current_row, column=6, value=row.get('unit', ''))
-                ws.cell(row=current_row, column=7, value=row.get('room', ''))
-                ws.cell(row=current_row, column=8, value=row.get('component', ''))
-                ws.cell(row=current_row, column=9, value=row.get('trade', ''))
-                
-                # Add file path in the last column
-                file_path = row.get('file_path', '')
-                path_cell = ws.cell(row=current_row, column=10, value=file_path)
-                path_cell.font = Font(size=9, color="0000FF")  # Blue, smaller font
+            for record in records:
+                ws.append(record)
+                ws.cell(row=current_row, column=10).font = path_font
                 
                 current_row += 1
             
@@ -964,12 +1147,6 @@ class BuilderReportGenerator:
             ws['A1'] = 'Error loading file information'
             ws['A1'].font = Font(bold=True, size=12, color="FF0000")
             ws['A3'] = f'Error: {str(e)}'
-        finally:
-            if conn:
-                try:
-                    conn.close()
-                except:
-                    pass
     
     def _add_bar_chart(self, ws, title, x_title, y_title):
         """Add a bar chart to worksheet"""
@@ -991,97 +1168,9 @@ class BuilderReportGenerator:
         except Exception as e:
             logger.warning(f"Could not add chart: {e}")
     
-    def generate_report_package(self, builder_name=None, inspection_id=None, include_photos=False, status_filter=None):
-        """Generate a ZIP package containing the Excel report and all attached files"""
-        import zipfile
-        import shutil
-        
-        temp_files = []
-        temp_dir = None
-        
-        try:
-            # Generate the Excel report WITH Files sheet
-            excel_output = self.generate_excel_report(
-                builder_name=builder_name,
-                inspection_id=inspection_id,
-                include_photos=include_photos,
-                status_filter=status_filter,
-                include_files_sheet=True  # Include Files sheet in ZIP package
-            )
-            
-            if not excel_output:
-                return None
-            
-            # Create temporary directory for the package
-            temp_dir = tempfile.mkdtemp()
-            attachments_dir = os.path.join(temp_dir, 'attachments')
-            os.makedirs(attachments_dir, exist_ok=True)
-            
-            # Save Excel file
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            excel_filename = f'Work_Orders_Report_{timestamp}.xlsx'
-            excel_path = os.path.join(temp_dir, excel_filename)
-            with open(excel_path, 'wb') as f:
-                f.write(excel_output.getvalue())
-            
-            # Get all files from database
-            conn = self._get_fresh_connection()
-            files_copied = 0
-            files_failed = 0
-            
-            try:
-                query = """
-                    SELECT 
-                        wof.work_order_id,
-                        wof.original_filename,
-                        wof.file_path,
-                        wof.file_type
-                    FROM work_order_files wof
-                    INNER JOIN inspector_work_orders wo ON wof.work_order_id = wo.id
-                    WHERE 1=1
-                """
-                
-                params = []
-                if inspection_id:
-                    query += " AND wo.inspection_id = ?"
-                    params.append(inspection_id)
-                
-                if status_filter:
-                    query += f" AND {status_filter}"
-                
-                files_df = pd.read_sql_query(query, conn, params=params if params else None)
-                logger.info(f"Found {len(files_df)} files to copy")
-                
-                # Copy files to attachments folder
-                for idx, row in files_df.iterrows():
-                    source_path = row['file_path']
-                    if os.path.exists(source_path):
-                        # Create work order subfolder
-                        wo_folder = os.path.join(attachments_dir, str(row['work_order_id']))
-                        os.makedirs(wo_folder, exist_ok=True)
-                        
-                        # Copy file with original filename
-                        dest_path = os.path.join(wo_folder, row['original_filename'])
-                        try:
-                            shutil.copy2(source_path, dest_path)
-                            files_copied += 1
-                            logger.info(f"✅ Copied: {row['original_filename']}")
-                        except Exception as e:
-                            logger.warning(f"❌ Could not copy {source_path}: {e}")
-                            files_failed += 1
-                    else:
-                        logger.warning(f"File not found: {source_path}")
-                        files_failed += 1
-                
-                logger.info(f"Copied {files_copied} files, {files_failed} failed")
-                
-            finally:
-                conn.close()
-            
-            # Create README file with instructions
-            readme_path = os.path.join(temp_dir, 'README.txt')
-            with open(readme_path, 'w', encoding='utf-8') as f:
-                f.write(f"""Work Orders Report Package
+    def _package_readme(self, excel_filename, files_copied, files_failed):
+        """Build the README.txt text included in the ZIP package"""
+        return f"""Work Orders Report Package
 {'=' * 50}
 
 📦 Package Contents:
@@ -1126,43 +1215,315 @@ class BuilderReportGenerator:
 
 ---
 Building Inspection System V3
-""")
+"""
+    
+    def has_work_orders(self, inspection_id=None, status_filter=None):
+        """Cheap preflight: does any work order match the report filters?"""
+        self._check_status_filter(status_filter)
+        conn = None
+        try:
+            conn = self._get_readonly_connection()
+            return not self._run_query(conn, 'work_order_exists', inspection_id, status_filter).empty
+        except Exception as e:
+            logger.warning(f"Could not check for work orders: {e}")
+            # Let the full report run and report the problem itself
+            return True
+        finally:
+            if conn:
+                try:
+                    conn.close()
+                except:
+                    pass
+    
+    def get_data_version(self, inspection_id=None):
+        """Cheap fingerprint of the data a report depends on
+        
+        Latest work order update, a digest of the Defects sheet rows and the
+        latest upload (with row counts, so deletes are noticed too), all scoped
+        to ``inspection_id`` when given. Any change means a cached package is stale.
+        """
+        conn = None
+        try:
+            conn = self._get_readonly_connection()
+            
+            sql = "SELECT MAX(updated_at), COUNT(*) FROM inspector_work_orders"
+            params = ()
+            if inspection_id:
+                sql += " WHERE inspection_id = ?"
+                params = (inspection_id,)
+            version = tuple(conn.execute(sql, params).fetchone())
+            
+            # inspector_inspection_items has no updated_at, so edited defects are
+            # caught by hashing the rows the Defects sheet is built from
+            defect_rows = conn.execute(self._build_query('defects', bool(inspection_id)), params).fetchall()
+            version += (len(defect_rows),
+                        hashlib.blake2b(repr(defect_rows).encode(), digest_size=16).hexdigest())
+            
+            table = self._attachments_table(conn)
+            if table:
+                sql = f"SELECT MAX(wof.uploaded_at), COUNT(*) FROM {table} wof"
+                if inspection_id:
+                    sql += (" INNER JOIN inspector_work_orders wo ON wof.work_order_id = wo.id"
+                            " WHERE wo.inspection_id = ?")
+                version += tuple(conn.execute(sql, params).fetchone())
+            return version
+            
+        except Exception as e:
+            logger.warning(f"Could not read data version: {e}")
+            # Unique value so nothing stale is served
+            return (datetime.now().isoformat(),)
+        finally:
+            if conn:
+                try:
+                    conn.close()
+                except:
+                    pass
+    
+    def generate_report_package(self, builder_name=None, inspection_id=None, include_photos=False, status_filter=None, output_dir=None, raise_errors=False):
+        """Generate a ZIP package containing the Excel report and all attached files
+        
+        The archive is streamed to a temp file on disk (in ``output_dir`` if given)
+        so memory stays flat no matter how large the attachments are.
+        
+        Returns:
+            A binary file handle opened for reading, or None on failure. The caller
+            owns the handle and should close it and delete ``handle.name`` when done.
+            With ``raise_errors`` the failure propagates instead.
+        """
+        self._check_status_filter(status_filter)
+        zip_path = None
+        packaged = False
+        conn = None
+        
+        try:
+            # One read-only handle serves the Excel report and the attachment query
+            conn = self._get_readonly_connection()
+            
+            timestamp = time.strftime('%Y%m%d_%H%M%S')
+            excel_filename = f'Work_Orders_Report_{timestamp}.xlsx'
             
-            # Create ZIP file
-            zip_output = BytesIO()
-            with zipfile.ZipFile(zip_output, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add Excel report
-                zipf.write(excel_path, excel_filename)
+            # Create ZIP file on disk
+            with tempfile.NamedTemporaryFile(suffix='.zip', dir=output_dir, delete=False) as zip_output:
+                zip_path = zip_output.name
+            # A 1 MiB write buffer coalesces zipfile's many small header writes
+            with open(zip_path, 'wb', buffering=ZIP_COPY_CHUNK) as zip_output, \
+                    zipfile.ZipFile(zip_output, 'w') as zipf:
+                # Save the Excel report WITH Files sheet straight into its ZIP entry,
+                # so the workbook is never held as a second in-memory copy
+                excel_info = _zip_info(None, excel_filename)
+                with zipf.open(excel_info, 'w', force_zip64=True) as excel_entry:
+                    excel_output = self.generate_excel_report(
+                        builder_name=builder_name,
+                        inspection_id=inspection_id,
+                        include_photos=include_photos,
+                        status_filter=status_filter,
+                        include_files_sheet=True,  # Include Files sheet in ZIP package
+                        conn=conn,
+                        output=excel_entry,
+                        raise_errors=raise_errors
+                    )
+                
+                if not excel_output:
+                    return None
+                
+                # Get all files from database
+                files_df = self._run_query(conn, 'package_files', inspection_id, status_filter)
+                logger.info(f"Found {len(files_df)} files to package")
+                
+                file_sizes = _stat_file_sizes(files_df['file_path'])
+                files_copied = 0
+                files_failed = 0
+                
+                # Add attachments, organized by work order
+                entries = []
+                for idx, row in files_df.iterrows():
+                    source_path = row['file_path']
+                    if file_sizes.get(source_path) is None:
+                        logger.warning(f"File not found: {source_path}")
+                        files_failed += 1
+                        continue
+                    entries.append((source_path, row['work_order_id'], row['original_filename']))
+                
+                def read_ahead_size(entry):
+                    size = file_sizes[entry[0]]
+                    return 0 if size > PREFETCH_MAX_BYTES else size
                 
-                # Add README
-                zipf.write(readme_path, 'README.txt')
+                def read_attachment(entry):
+                    source_path = entry[0]
+                    if file_sizes[source_path] > PREFETCH_MAX_BYTES:
+                        return None
+                    with open(source_path, 'rb') as f:
+                        return f.read()
                 
-                # Add all files from attachments folder
-                if os.path.exists(attachments_dir) and os.listdir(attachments_dir):
-                    for root, dirs, files in os.walk(attachments_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            arcname = os.path.relpath(file_path, temp_dir)
-                            zipf.write(file_path, arcname)
-            
-            zip_output.seek(0)
+                # Worker threads read ahead while this thread alone writes the ZIP
+                # (zipfile isn't thread safe)
+                with ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+                    reads = _read_ahead(executor, read_attachment, entries, PREFETCH_WORKERS * 2,
+                                        PREFETCH_WINDOW_BYTES, read_ahead_size)
+                    for (source_path, work_order_id, original_filename), read in zip(entries, reads):
+                        arcname = f"attachments/{work_order_id}/{original_filename}"
+                        try:
+                            data = read.result()
+                            if data is None:
+                                _zip_copy(zipf, source_path, arcname)
+                            else:
+                                zipf.writestr(_zip_info(source_path, arcname), data,
+                                              *_zip_compression(arcname))
+                            files_copied += 1
+                            logger.info(f"✅ Added: {original_filename}")
+                        except Exception as e:
+                            logger.warning(f"❌ Could not add {source_path}: {e}")
+                            files_failed += 1
+                
+                logger.info(f"Added {files_copied} files, {files_failed} failed")
+                
+                # Add README with instructions
+                zipf.writestr('README.txt', self._package_readme(excel_filename, files_copied, files_failed),
+                              *_zip_compression('README.txt'))
+            
             logger.info(f"✅ ZIP package created: {files_copied} files included")
-            return zip_output
+            zip_file = open(zip_path, 'rb', buffering=ZIP_COPY_CHUNK)
+            packaged = True
+            return zip_file
             
         except Exception as e:
             logger.error(f"❌ Error creating ZIP package: {e}")
             import traceback
             logger.error(traceback.format_exc())
+            if raise_errors:
+                raise
             return None
             
         finally:
-            # Clean up temporary directory
-            if temp_dir and os.path.exists(temp_dir):
+            if conn:
                 try:
-                    shutil.rmtree(temp_dir)
-                    logger.info("🧹 Cleaned up temp directory")
-                except Exception as e:
-                    logger.warning(f"Could not clean up temp dir: {e}")
+                    conn.close()
+                except:
+                    pass
+            
+            # Don't leave a partial archive behind on failure or when there was no data
+            if not packaged and zip_path and os.path.exists(zip_path):
+                os.remove(zip_path)
+
+
+@lru_cache(maxsize=2)
+def _package_contents_md(include_photos):
+    """Markdown for the Package Contents expander (``__SEL__`` = inspection label)"""
+    return "\n".join([
+        "**Format:** ZIP Package  ",
+        "**Inspection:** __SEL__  ",
+        "**Includes:**",
+        "- Excel report with all sheets",
+        f"- {'📷 Embedded photos' if include_photos else 'No photos'}",
+        "- 📎 Files sheet (reference list)",
+        "- 📁 attachments/ folder with all uploaded files",
+        "- 📄 README.txt with instructions",
+    ])
+
+
+# UI status filter options mapped to BuilderReportGenerator.STATUS_FILTERS keys
+STATUS_FILTER_OPTIONS = {
+    "All Statuses": None,
+    "Active Only (Exclude Pending)": 'active',
+    "Non-Pending Only": 'non_pending',
+    "Pending Only": 'pending',
+}
+
+
+# Built ZIP packages are kept on disk and reused while the data is unchanged
+PACKAGE_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'builder_report_packages')
+PACKAGE_CACHE_TTL = 600  # seconds
+PACKAGE_POLL_INTERVAL = 1  # seconds between checks on a running package job
+
+
+def _prune_package_cache():
+    """Delete cached package files that have outlived the cache TTL"""
+    cutoff = datetime.now().timestamp() - PACKAGE_CACHE_TTL
+    try:
+        with os.scandir(PACKAGE_CACHE_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+    except FileNotFoundError:
+        pass
+
+
+@st.cache_resource(show_spinner=False)
+def _get_generator(_db_manager, db_path):
+    """One shared report generator per database
+    
+    The generator holds no per-report state - connections, workbooks and
+    data frames all live inside each call - so it is safe to reuse.
+    """
+    return BuilderReportGenerator(_db_manager)
+
+
+def _package_cache_path(package_args):
+    """On-disk location of the package built for one filter set and data version"""
+    key = hashlib.blake2b(repr(package_args).encode(), digest_size=16).hexdigest()
+    return os.path.join(PACKAGE_CACHE_DIR, f'package_{key}.zip')
+
+
+def _build_package(generator, package_args):
+    """Build a ZIP package and return its path - cached per filters and data version
+    
+    This runs on the package executor, which has no script-run context for
+    st.cache_data, so the cache is the package file itself: it is named after
+    ``package_args`` and reused until _prune_package_cache() expires it.
+    Failures raise, and nothing is cached for them.
+    """
+    _prune_package_cache()
+    zip_path = _package_cache_path(package_args)
+    if os.path.exists(zip_path):
+        return zip_path
+    os.makedirs(PACKAGE_CACHE_DIR, exist_ok=True)
+    
+    db_path, inspection_id, include_photos, status_key, data_version = package_args
+    zip_file = generator.generate_report_package(
+        builder_name=None,
+        inspection_id=inspection_id,
+        include_photos=include_photos,
+        status_filter=status_key,
+        output_dir=PACKAGE_CACHE_DIR,
+        raise_errors=True  # runs on the package executor, where st.* output is dropped
+    )
+    if not zip_file:
+        raise RuntimeError("Package generation failed - see the log for details")
+    zip_file.close()
+    # Publish under the cache name only once the archive is complete
+    os.replace(zip_file.name, zip_path)
+    return zip_path
+
+
+@st.cache_data(ttl=PACKAGE_CACHE_TTL, show_spinner=False)
+def _has_package_data(_db_manager, db_path, inspection_id, include_photos, status_key, data_version):
+    """Empty-set preflight, cached under the same key as the package itself"""
+    return _get_generator(_db_manager, db_path).has_work_orders(inspection_id, status_key)
+
+
+# Packages are built off the Streamlit script thread so the page stays responsive
+_PACKAGE_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='report-package')
+
+
+@st.fragment(run_every=PACKAGE_POLL_INTERVAL)
+def _package_progress(future, selected_text):
+    """Poll a running package job, re-running the whole page once it is done"""
+    if future.done():
+        st.rerun()
+    st.info(f"📦 Creating package for: **{selected_text}** (this may take a moment...)")
+    st.caption("🔄 Generating ZIP package with all files...")
+
+
+# Characters dropped from the inspection label when it becomes part of a filename
+_FILENAME_TRANS = str.maketrans('', '', '():')
+
+
+def _filename_part(label):
+    """Turn an inspection selector label into a short filename fragment"""
+    return label.replace(' - ', '_').translate(_FILENAME_TRANS)[:50]
 
 
 def add_builder_report_ui(db_manager):
@@ -1170,13 +1531,14 @@ def add_builder_report_ui(db_manager):
     
     st.info("💡 Generate comprehensive reports of work orders and defects")
     
+    db_path = db_manager.db_path if hasattr(db_manager, 'db_path') else "building_inspection.db"
+    
     col1, col2 = st.columns([2, 1])
     
     with col1:
         conn = None
         try:
             # Use fresh connection
-            db_path = db_manager.db_path if hasattr(db_manager, 'db_path') else "building_inspection.db"
             conn = sqlite3.connect(db_path, check_same_thread=False, detect_types=0)
             
             # Get inspections with work order counts by status
@@ -1233,7 +1595,7 @@ def add_builder_report_ui(db_manager):
         # Status filter option
         status_filter_option = st.selectbox(
             "📊 Status Filter",
-            ["All Statuses", "Active Only (Exclude Pending)", "Non-Pending Only", "Pending Only"],
+            list(STATUS_FILTER_OPTIONS),
             key="report_status_filter",
             help="Filter which work orders to include"
         )
@@ -1275,57 +1637,50 @@ def add_builder_report_ui(db_manager):
                 # Get the actual inspection ID from the map
                 inspection_id = inspection_id_map.get(selected_inspection_idx)
                 
-                # Map status filter to SQL condition
-                status_sql = None
-                if status_filter_option == "Active Only (Exclude Pending)":
-                    status_sql = "wo.status != 'pending'"
-                elif status_filter_option == "Non-Pending Only":
-                    status_sql = "wo.status IN ('in_progress', 'waiting_approval', 'approved')"
-                elif status_filter_option == "Pending Only":
-                    status_sql = "wo.status = 'pending'"
+                # Map status filter option to a whitelisted filter key
+                status_key = STATUS_FILTER_OPTIONS[status_filter_option]
                 
                 # Debug output with actual values
                 selected_text = inspection_options[selected_inspection_idx]
-                logger.info(f"🔍 Excel Report Generation:")
-                logger.info(f"   - Selected: {selected_text}")
-                logger.info(f"   - Inspection ID: {inspection_id}")
-                logger.info(f"   - Include Photos: {include_photos}")
-                logger.info(f"   - Status Filter: {status_filter_option}")
+                logger.info("🔍 Excel Report Generation: selected=%s inspection_id=%s include_photos=%s status_filter=%s",
+                            selected_text, inspection_id, include_photos, status_filter_option)
                 
                 st.info(f"🔍 Generating Excel report for: **{selected_text}**")
                 
-                generator = BuilderReportGenerator(db_manager)
+                generator = _get_generator(db_manager, db_path)
                 excel_file = generator.generate_excel_report(
                     builder_name=None,
                     inspection_id=inspection_id,
                     include_photos=include_photos,
-                    status_filter=status_sql,
+                    status_filter=status_key,
                     include_files_sheet=False  # No Files sheet in standalone Excel
                 )
                 
                 if excel_file:
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    inspection_name = selected_text.replace(' - ', '_').replace('(', '').replace(')', '').replace(':', '')
-                    if len(inspection_name) > 50:
-                        inspection_name = inspection_name[:50]
+                    timestamp = time.strftime('%Y%m%d_%H%M%S')
+                    inspection_name = _filename_part(selected_text)
                     
                     filename = f"Work_Orders_{inspection_name}_{timestamp}.xlsx"
                     
-                    st.download_button(
-                        label="📥 Download Excel Report",
-                        data=excel_file,
-                        file_name=filename,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True,
-                        key="report_download_excel_button"
-                    )
-                    
-                    st.success("✅ Excel report generated!")
-                    
-                    with st.expander("📊 Report Summary"):
-                        st.write(f"**Format:** Excel Only (no attachments)")
-                        st.write(f"**Inspection:** {selected_text}")
-                        st.write(f"**Photos:** {'Embedded in report' if include_photos else 'Not included'}")
+                    # Download button and summary render together as one block
+                    with st.container():
+                        st.download_button(
+                            label="📥 Download Excel Report",
+                            data=excel_file,
+                            file_name=filename,
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            use_container_width=True,
+                            key="report_download_excel_button"
+                        )
+                        
+                        st.success("✅ Excel report generated!")
+                        
+                        with st.expander("📊 Report Summary"):
+                            st.markdown(
+                                "**Format:** Excel Only (no attachments)  \n"
+                                f"**Inspection:** {selected_text}  \n"
+                                f"**Photos:** {'Embedded in report' if include_photos else 'Not included'}"
+                            )
                 else:
                     st.warning("⚠️ No data available")
                     
@@ -1333,73 +1688,90 @@ def add_builder_report_ui(db_manager):
                 logger.error(f"Excel report error: {e}")
                 st.error(f"❌ Error: {e}")
     
-    # Handle ZIP Package download
+    # Handle ZIP Package download - start a background job; reruns poll it below
     if zip_package_button:
-        with st.spinner("🔄 Generating ZIP package with all files..."):
-            try:
-                # Get the actual inspection ID from the map
-                inspection_id = inspection_id_map.get(selected_inspection_idx)
-                
-                # Map status filter to SQL condition
-                status_sql = None
-                if status_filter_option == "Active Only (Exclude Pending)":
-                    status_sql = "wo.status != 'pending'"
-                elif status_filter_option == "Non-Pending Only":
-                    status_sql = "wo.status IN ('in_progress', 'waiting_approval', 'approved')"
-                elif status_filter_option == "Pending Only":
-                    status_sql = "wo.status = 'pending'"
-                
-                selected_text = inspection_options[selected_inspection_idx]
-                logger.info(f"🔍 ZIP Package Generation:")
-                logger.info(f"   - Selected: {selected_text}")
-                logger.info(f"   - Inspection ID: {inspection_id}")
-                logger.info(f"   - Include Photos: {include_photos}")
-                
-                st.info(f"📦 Creating package for: **{selected_text}** (this may take a moment...)")
+        try:
+            # Get the actual inspection ID from the map
+            inspection_id = inspection_id_map.get(selected_inspection_idx)
+            
+            # Map status filter option to a whitelisted filter key
+            status_key = STATUS_FILTER_OPTIONS[status_filter_option]
+            
+            selected_text = inspection_options[selected_inspection_idx]
+            logger.info("🔍 ZIP Package Generation: selected=%s inspection_id=%s include_photos=%s",
+                        selected_text, inspection_id, include_photos)
+            
+            generator = _get_generator(db_manager, db_path)
+            package_args = (db_path, inspection_id, include_photos, status_key,
+                            generator.get_data_version(inspection_id))
+            
+            if _has_package_data(db_manager, *package_args):
+                st.session_state['report_package_job'] = {
+                    'future': _PACKAGE_EXECUTOR.submit(_build_package, generator, package_args),
+                    'selection': package_args[:4],
+                    'selected_text': selected_text,
+                    'include_photos': include_photos,
+                }
+            else:
+                # Nothing matches the filters - skip building an empty package
+                st.session_state.pop('report_package_job', None)
+                st.warning("⚠️ No data available")
+        except Exception as e:
+            logger.error(f"ZIP package error: {e}")
+            st.error(f"❌ Error: {e}")
+    
+    package_job = st.session_state.get('report_package_job')
+    if package_job:
+        selection = (db_path, inspection_id_map.get(selected_inspection_idx), include_photos,
+                     STATUS_FILTER_OPTIONS[status_filter_option])
+        if package_job['selection'] != selection:
+            # The filters changed since this package was requested - drop it
+            del st.session_state['report_package_job']
+            return
+        
+        selected_text = package_job['selected_text']
+        future = package_job['future']
+        
+        if not future.done():
+            # Only the progress fragment re-runs while the package builds
+            _package_progress(future, selected_text)
+            return
+        
+        try:
+            zip_path = future.result()
+            
+            if not os.path.exists(zip_path):
+                # Packages are pruned after the cache TTL
+                del st.session_state['report_package_job']
+                st.info("⌛ This package has expired - please generate it again.")
+            else:
+                timestamp = time.strftime('%Y%m%d_%H%M%S')
+                inspection_name = _filename_part(selected_text)
                 
-                generator = BuilderReportGenerator(db_manager)
-                zip_file = generator.generate_report_package(
-                    builder_name=None,
-                    inspection_id=inspection_id,
-                    include_photos=include_photos,
-                    status_filter=status_sql
-                )
+                filename = f"Work_Orders_Package_{inspection_name}_{timestamp}.zip"
                 
-                if zip_file:
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    inspection_name = selected_text.replace(' - ', '_').replace('(', '').replace(')', '').replace(':', '')
-                    if len(inspection_name) > 50:
-                        inspection_name = inspection_name[:50]
-                    
-                    filename = f"Work_Orders_Package_{inspection_name}_{timestamp}.zip"
-                    
-                    st.download_button(
-                        label="📦 Download ZIP Package",
-                        data=zip_file,
-                        file_name=filename,
-                        mime="application/zip",
-                        use_container_width=True,
-                        key="report_download_zip_button"
-                    )
+                # Download button and summary render together as one block
+                with st.container():
+                    # The package stays on disk for the cache; it is pruned after the TTL
+                    with open(zip_path, 'rb', buffering=ZIP_COPY_CHUNK) as zip_file:
+                        st.download_button(
+                            label="📦 Download ZIP Package",
+                            data=zip_file,
+                            file_name=filename,
+                            mime="application/zip",
+                            use_container_width=True,
+                            key="report_download_zip_button"
+                        )
                     
                     st.success("✅ ZIP package created successfully!")
                     
                     with st.expander("📦 Package Contents", expanded=True):
-                        st.write(f"**Format:** ZIP Package")
-                        st.write(f"**Inspection:** {selected_text}")
-                        st.write(f"**Includes:**")
-                        st.write(f"  • Excel report with all sheets")
-                        st.write(f"  • {'📷 Embedded photos' if include_photos else 'No photos'}")
-                        st.write(f"  • 📎 Files sheet (reference list)")
-                        st.write(f"  • 📁 attachments/ folder with all uploaded files")
-                        st.write(f"  • 📄 README.txt with instructions")
+                        st.markdown(_package_contents_md(package_job['include_photos']).replace('__SEL__', selected_text))
                         st.info("💡 **Tip:** Extract the ZIP file and keep all files together. The Files sheet shows relative paths that work within the extracted folder.")
-                else:
-                    st.warning("⚠️ No data available")
-                    
-            except Exception as e:
-                logger.error(f"ZIP package error: {e}")
-                st.error(f"❌ Error: {e}")
-                import traceback
-                with st.expander("🔍 Error Details"):
-                    st.code(traceback.format_exc())
\ No newline at end of file
+                
+        except Exception as e:
+            logger.error(f"ZIP package error: {e}")
+            st.error(f"❌ Error: {e}")
+            import traceback
+            with st.expander("🔍 Error Details"):
+                st.code(traceback.format_exc())
\ No newline at end of file
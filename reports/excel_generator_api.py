@@ -13,7 +13,12 @@ Features:
 
 import os
 import io
+import sys
 import requests
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from io import BytesIO
@@ -21,9 +26,57 @@ from PIL import Image
 import openpyxl
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.drawing.image import Image as XLImage
 from openpyxl.utils import get_column_letter
 
+# Concurrent photo downloads per report; one pooled connection per worker
+PHOTO_DOWNLOAD_WORKERS = 16
+
+# Largest photo body downloaded for thumbnailing; bigger bodies are skipped
+PHOTO_MAX_BYTES = 32 << 20
+PHOTO_READ_CHUNK = 64 << 10
+
+# Photo column thumbnail size in pixels (width, height)
+THUMBNAIL_SIZE = (150, 150)
+
+# Rows per round-trip when streaming defects from the database
+DEFECT_FETCH_SIZE = 2000
+
+# Shared cell styles, built once rather than per row (openpyxl styles are immutable)
+_HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+_HEADER_FONT = Font(color="FFFFFF", bold=True, size=11)
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center", wrap_text=True)
+_BOLD_FONT = Font(bold=True)
+_WRAP_ALIGNMENT = Alignment(vertical="top", wrap_text=True)
+_CENTER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+_THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+# Defect table columns, shared by the single and multi-inspection sheets
+_DEFECT_HEADERS = ('Room', 'Component', 'Issue Description', 'Trade', 'Priority', 'Status', 'Inspector Notes', 'Photo')
+_DEFECT_COLUMN_WIDTHS = (
+    ('A', 20),  # Room
+    ('B', 25),  # Component
+    ('C', 30),  # Issue Description
+    ('D', 15),  # Trade
+    ('E', 12),  # Priority
+    ('F', 12),  # Status
+    ('G', 50),  # Inspector Notes
+    ('H', 20),  # Photo
+)
+
+# Priority column colour coding
+_PRIORITY_FILLS = {
+    'High': PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid"),
+    'Medium': PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid"),
+    'Low': PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid"),
+}
+
 
 class ExcelGeneratorAPI:
     """Generate Excel reports for API inspections with photo support"""
@@ -36,33 +89,78 @@ class ExcelGeneratorAPI:
             api_key: SafetyCulture API key for downloading photos
         """
         self.api_key = api_key
-        self.photo_cache = {}  # Cache downloaded photos to avoid re-downloading
+        self.photo_cache = {}  # URL -> encoded thumbnail bytes (None if the download failed)
+        
+        # One keep-alive session so photos reuse TCP/TLS connections
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {api_key}'
+        adapter = HTTPAdapter(
+            pool_connections=PHOTO_DOWNLOAD_WORKERS,
+            pool_maxsize=PHOTO_DOWNLOAD_WORKERS * 2,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
-    def download_photo(self, photo_url: str) -> Optional[Image.Image]:
+    def download_photo(self, photo_url: str) -> Optional[bytes]:
         """
-        Download a photo from SafetyCulture API
+        Download a photo from SafetyCulture API as a thumbnail
         
         Args:
             photo_url: URL to the photo
             
         Returns:
-            PIL Image object or None if download fails
+            Encoded thumbnail bytes or None if download fails
         """
         # Check cache first
-        if photo_url in self.photo_cache:
-            return self.photo_cache[photo_url]
+        if photo_url not in self.photo_cache:
+            self.photo_cache[photo_url] = self._fetch_photo(photo_url)
+        return self.photo_cache[photo_url]
+    
+    def prefetch_photos(self, photo_urls: List[str]):
+        """
+        Download all uncached photos concurrently into the photo cache
+        
+        Args:
+            photo_urls: Photo URLs for the report (duplicates are fetched once)
+        """
+        pending = [url for url in dict.fromkeys(photo_urls) if url not in self.photo_cache]
+        if not pending:
+            return
         
+        with ThreadPoolExecutor(max_workers=min(PHOTO_DOWNLOAD_WORKERS, len(pending))) as executor:
+            self.photo_cache.update(zip(pending, executor.map(self._fetch_photo, pending)))
+    
+    def _fetch_photo(self, photo_url: str) -> Optional[bytes]:
+        """Download one photo over the shared session and encode its thumbnail (no caching)"""
         try:
-            headers = {'Authorization': f'Bearer {self.api_key}'}
-            response = requests.get(photo_url, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                img = Image.open(BytesIO(response.content))
-                self.photo_cache[photo_url] = img
-                return img
-            else:
-                print(f"Failed to download photo: {photo_url} (Status: {response.status_code})")
-                return None
+            # Read the body in chunks up to PHOTO_MAX_BYTES, so an oversized
+            # photo is rejected before it is buffered in full
+            with self.session.get(photo_url, stream=True, timeout=30) as response:
+                if response.status_code != 200:
+                    print(f"Failed to download photo: {photo_url} (Status: {response.status_code})")
+                    return None
+                
+                if int(response.headers.get('Content-Length') or 0) > PHOTO_MAX_BYTES:
+                    print(f"Skipping oversized photo: {photo_url}")
+                    return None
+                
+                body = BytesIO()
+                for chunk in response.iter_content(PHOTO_READ_CHUNK):
+                    body.write(chunk)
+                    if body.tell() > PHOTO_MAX_BYTES:
+                        print(f"Skipping oversized photo: {photo_url}")
+                        return None
+            
+            body.seek(0)
+            img = Image.open(body)
+            if img.format == 'JPEG':
+                # Let libjpeg decode at 1/2-1/8 scale, still at least twice the thumbnail size
+                img.draft('RGB', (THUMBNAIL_SIZE[0] * 2, THUMBNAIL_SIZE[1] * 2))
+            img.load()
+            
+            # Only the small encoded thumbnail is kept; the full-resolution pixels are dropped here
+            return _encode_thumbnail(img, THUMBNAIL_SIZE).getvalue()
                 
         except Exception as e:
             print(f"Error downloading photo from {photo_url}: {str(e)}")
@@ -72,25 +170,16 @@ class ExcelGeneratorAPI:
         """
         Resize image to thumbnail maintaining aspect ratio
         
+        The caller's image is left untouched; the thumbnail is made from a copy.
+        
         Args:
             img: PIL Image object
             size: Target thumbnail size (width, height)
             
         Returns:
-            BytesIO object containing the resized image
+            BytesIO object containing the resized image as an RGB JPEG
         """
-        # Create a copy to avoid modifying the cached image
-        img_copy = img.copy()
-        
-        # Calculate aspect ratio preserving resize
-        img_copy.thumbnail(size, Image.Resampling.LANCZOS)
-        
-        # Save to BytesIO
-        output = BytesIO()
-        img_copy.save(output, format='PNG')
-        output.seek(0)
-        
-        return output
+        return _encode_thumbnail(img.copy(), size)
     
     def generate_single_inspection_report(
         self,
@@ -110,168 +199,44 @@ class ExcelGeneratorAPI:
             True if successful, False otherwise
         """
         try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Inspection Report"
-            
-            # Set column widths
-            ws.column_dimensions['A'].width = 20  # Room
-            ws.column_dimensions['B'].width = 25  # Component
-            ws.column_dimensions['C'].width = 30  # Issue Description
-            ws.column_dimensions['D'].width = 15  # Trade
-            ws.column_dimensions['E'].width = 12  # Priority
-            ws.column_dimensions['F'].width = 12  # Status
-            ws.column_dimensions['G'].width = 50  # Inspector Notes
-            ws.column_dimensions['H'].width = 20  # Photo
-            
-            # Header styles
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_font = Font(color="FFFFFF", bold=True, size=11)
-            header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # Title Section
-            ws.merge_cells('A1:H1')
-            title_cell = ws['A1']
-            title_cell.value = "BUILDING INSPECTION REPORT"
-            title_cell.font = Font(size=16, bold=True, color="366092")
-            title_cell.alignment = Alignment(horizontal="center", vertical="center")
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Inspection Report")
+            _set_defect_column_widths(ws)
             
             # Inspection Details
-            current_row = 3
+            defect_count, photo_count, note_count = _defect_counts(defects)
             details = [
                 ("Building:", inspection_data.get('building_name', 'N/A')),
                 ("Inspection Date:", inspection_data.get('inspection_date', 'N/A')),
                 ("Inspector:", inspection_data.get('inspector_name', 'N/A')),
-                ("Total Defects:", str(len(defects))),
-                ("With Photos:", str(sum(1 for d in defects if d.get('photo_url')))),
-                ("With Notes:", str(sum(1 for d in defects if d.get('inspector_notes'))))
+                ("Total Defects:", str(defect_count)),
+                ("With Photos:", str(photo_count)),
+                ("With Notes:", str(note_count))
             ]
+            header_row = len(details) + 4
             
-            for label, value in details:
-                ws[f'A{current_row}'] = label
-                ws[f'A{current_row}'].font = Font(bold=True)
-                ws[f'B{current_row}'] = value
-                ws.merge_cells(f'B{current_row}:C{current_row}')
-                current_row += 1
+            # Freeze header rows (write-only sheets need this before the first row)
+            ws.freeze_panes = f'A{header_row + 1}'
             
-            current_row += 1
+            # Title Section
+            ws.append([_styled_cell(
+                ws, "BUILDING INSPECTION REPORT",
+                font=Font(size=16, bold=True, color="366092"),
+                alignment=Alignment(horizontal="center", vertical="center")
+            )])
+            ws.merged_cells.add('A1:H1')
+            ws.append([])
             
-            # Header Row
-            headers = ['Room', 'Component', 'Issue Description', 'Trade', 'Priority', 'Status', 'Inspector Notes', 'Photo']
-            for col_num, header in enumerate(headers, 1):
-                cell = ws.cell(row=current_row, column=col_num)
-                cell.value = header
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
-                cell.border = thin_border
-            
-            header_row = current_row
-            current_row += 1
+            for current_row, (label, value) in enumerate(details, 3):
+                ws.append([_styled_cell(ws, label, font=_BOLD_FONT), value])
+                ws.merged_cells.add(f'B{current_row}:C{current_row}')
             
-            # Data Rows
-            for defect in defects:
-                row_start = current_row
-                has_photo = bool(defect.get('photo_url'))
-                
-                # Set row height (120 pixels for photos, 30 for no photos)
-                ws.row_dimensions[current_row].height = 120 if has_photo else 30
-                
-                # Cell alignment for data
-                wrap_alignment = Alignment(vertical="top", wrap_text=True)
-                center_alignment = Alignment(horizontal="center", vertical="center")
-                
-                # Room (A)
-                cell = ws.cell(row=current_row, column=1)
-                cell.value = defect.get('room', '')
-                cell.alignment = wrap_alignment
-                cell.border = thin_border
-                
-                # Component (B)
-                cell = ws.cell(row=current_row, column=2)
-                cell.value = defect.get('component', '')
-                cell.alignment = wrap_alignment
-                cell.border = thin_border
-                
-                # Issue Description (C)
-                cell = ws.cell(row=current_row, column=3)
-                cell.value = defect.get('description', '')
-                cell.alignment = wrap_alignment
-                cell.border = thin_border
-                
-                # Trade (D)
-                cell = ws.cell(row=current_row, column=4)
-                cell.value = defect.get('trade', '')
-                cell.alignment = center_alignment
-                cell.border = thin_border
-                
-                # Priority (E)
-                cell = ws.cell(row=current_row, column=5)
-                priority = defect.get('priority', '')
-                cell.value = priority
-                cell.alignment = center_alignment
-                cell.border = thin_border
-                
-                # Color coding for priority
-                if priority == 'High':
-                    cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-                elif priority == 'Medium':
-                    cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-                elif priority == 'Low':
-                    cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                
-                # Status (F)
-                cell = ws.cell(row=current_row, column=6)
-                cell.value = defect.get('status', 'Open')
-                cell.alignment = center_alignment
-                cell.border = thin_border
-                
-                # Inspector Notes (G)
-                cell = ws.cell(row=current_row, column=7)
-                cell.value = defect.get('inspector_notes', '')
-                cell.alignment = wrap_alignment
-                cell.border = thin_border
-                
-                # Photo (H)
-                cell = ws.cell(row=current_row, column=8)
-                cell.border = thin_border
-                cell.alignment = center_alignment
-                
-                if has_photo:
-                    photo_url = defect['photo_url']
-                    img = self.download_photo(photo_url)
-                    
-                    if img:
-                        # Resize to thumbnail
-                        img_bytes = self.resize_to_thumbnail(img, size=(150, 150))
-                        
-                        # Create Excel image object
-                        xl_img = XLImage(img_bytes)
-                        
-                        # Position the image in the cell
-                        # Center it in the cell
-                        cell_letter = get_column_letter(8)
-                        xl_img.anchor = f'{cell_letter}{current_row}'
-                        
-                        # Add to worksheet
-                        ws.add_image(xl_img)
-                    else:
-                        cell.value = "Photo unavailable"
-                
-                current_row += 1
+            ws.append([])
             
-            # Freeze header rows
-            ws.freeze_panes = ws[f'A{header_row + 1}']
+            last_row = self._append_defect_rows(ws, defects, header_row)
             
             # Auto-filter
-            ws.auto_filter.ref = f'A{header_row}:H{current_row - 1}'
+            ws.auto_filter.ref = f'A{header_row}:H{last_row}'
             
             # Save workbook
             wb.save(output_path)
@@ -291,6 +256,9 @@ class ExcelGeneratorAPI:
         """
         Generate Excel report for multiple inspections with photos
         
+        Rows are streamed with a write-only workbook, so memory stays flat
+        however many inspections and defects the report holds.
+        
         Args:
             inspections: List of inspection dictionaries, each containing:
                 - inspection_data: metadata
@@ -301,33 +269,44 @@ class ExcelGeneratorAPI:
             True if successful, False otherwise
         """
         try:
-            wb = Workbook()
+            # Fetch every photo in the report in one concurrent pass; photos shared
+            # between inspections are downloaded and thumbnailed once
+            self.prefetch_photos([
+                d['photo_url'] for inspection in inspections for d in inspection['defects'] if d.get('photo_url')
+            ])
+            
+            wb = Workbook(write_only=True)
             
             # Summary sheet
-            ws_summary = wb.active
-            ws_summary.title = "Summary"
+            ws_summary = wb.create_sheet("Summary")
             
-            # Header styles
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_font = Font(color="FFFFFF", bold=True, size=11)
+            # Set column widths (write-only sheets need these before the first row)
+            ws_summary.column_dimensions['A'].width = 25
+            ws_summary.column_dimensions['B'].width = 15
+            ws_summary.column_dimensions['C'].width = 20
+            ws_summary.column_dimensions['D'].width = 15
+            ws_summary.column_dimensions['E'].width = 15
+            ws_summary.column_dimensions['F'].width = 15
+            ws_summary.column_dimensions['G'].width = 12
             
             # Summary title
-            ws_summary['A1'] = "MULTI-INSPECTION REPORT SUMMARY"
-            ws_summary['A1'].font = Font(size=16, bold=True, color="366092")
-            ws_summary.merge_cells('A1:G1')
-            ws_summary['A1'].alignment = Alignment(horizontal="center")
+            ws_summary.append([_styled_cell(
+                ws_summary, "MULTI-INSPECTION REPORT SUMMARY",
+                font=Font(size=16, bold=True, color="366092"),
+                alignment=Alignment(horizontal="center")
+            )])
+            ws_summary.merged_cells.add('A1:G1')
+            ws_summary.append([])
             
             # Summary headers
             summary_headers = ['Building', 'Inspection Date', 'Inspector', 'Total Defects', 'With Photos', 'With Notes', 'Status']
-            for col_num, header in enumerate(summary_headers, 1):
-                cell = ws_summary.cell(row=3, column=col_num)
-                cell.value = header
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="center", vertical="center")
+            ws_summary.append([
+                _styled_cell(ws_summary, header, font=_HEADER_FONT, fill=_HEADER_FILL,
+                             alignment=_CENTER_ALIGNMENT)
+                for header in summary_headers
+            ])
             
             # Summary data
-            row = 4
             total_defects = 0
             total_photos = 0
             total_notes = 0
@@ -336,38 +315,32 @@ class ExcelGeneratorAPI:
                 data = inspection['inspection_data']
                 defects = inspection['defects']
                 
-                defect_count = len(defects)
-                photo_count = sum(1 for d in defects if d.get('photo_url'))
-                note_count = sum(1 for d in defects if d.get('inspector_notes'))
+                defect_count, photo_count, note_count = _defect_counts(defects)
                 
                 total_defects += defect_count
                 total_photos += photo_count
                 total_notes += note_count
                 
-                ws_summary.cell(row=row, column=1, value=data.get('building_name', 'N/A'))
-                ws_summary.cell(row=row, column=2, value=data.get('inspection_date', 'N/A'))
-                ws_summary.cell(row=row, column=3, value=data.get('inspector_name', 'N/A'))
-                ws_summary.cell(row=row, column=4, value=defect_count)
-                ws_summary.cell(row=row, column=5, value=photo_count)
-                ws_summary.cell(row=row, column=6, value=note_count)
-                ws_summary.cell(row=row, column=7, value="Complete")
-                row += 1
+                ws_summary.append([
+                    data.get('building_name', 'N/A'),
+                    data.get('inspection_date', 'N/A'),
+                    data.get('inspector_name', 'N/A'),
+                    defect_count,
+                    photo_count,
+                    note_count,
+                    "Complete"
+                ])
             
             # Totals row
-            row += 1
-            ws_summary.cell(row=row, column=1, value="TOTALS").font = Font(bold=True)
-            ws_summary.cell(row=row, column=4, value=total_defects).font = Font(bold=True)
-            ws_summary.cell(row=row, column=5, value=total_photos).font = Font(bold=True)
-            ws_summary.cell(row=row, column=6, value=total_notes).font = Font(bold=True)
-            
-            # Set column widths
-            ws_summary.column_dimensions['A'].width = 25
-            ws_summary.column_dimensions['B'].width = 15
-            ws_summary.column_dimensions['C'].width = 20
-            ws_summary.column_dimensions['D'].width = 15
-            ws_summary.column_dimensions['E'].width = 15
-            ws_summary.column_dimensions['F'].width = 15
-            ws_summary.column_dimensions['G'].width = 12
+            ws_summary.append([])
+            ws_summary.append([
+                _styled_cell(ws_summary, "TOTALS", font=_BOLD_FONT),
+                None,
+                None,
+                _styled_cell(ws_summary, total_defects, font=_BOLD_FONT),
+                _styled_cell(ws_summary, total_photos, font=_BOLD_FONT),
+                _styled_cell(ws_summary, total_notes, font=_BOLD_FONT)
+            ])
             
             # Create individual sheets for each inspection
             for idx, inspection in enumerate(inspections, 1):
@@ -396,103 +369,145 @@ class ExcelGeneratorAPI:
         inspection_data: Dict[str, Any],
         defects: List[Dict[str, Any]]
     ):
-        """Helper method to add inspection data to a worksheet"""
-        
-        # Set column widths
-        ws.column_dimensions['A'].width = 20
-        ws.column_dimensions['B'].width = 25
-        ws.column_dimensions['C'].width = 30
-        ws.column_dimensions['D'].width = 15
-        ws.column_dimensions['E'].width = 12
-        ws.column_dimensions['F'].width = 12
-        ws.column_dimensions['G'].width = 50
-        ws.column_dimensions['H'].width = 20
+        """Helper method to stream inspection rows into a write-only worksheet"""
         
-        # Header styles
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_font = Font(color="FFFFFF", bold=True, size=11)
-        header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+        _set_defect_column_widths(ws)
         
         # Title
-        ws.merge_cells('A1:H1')
-        ws['A1'] = f"Inspection: {inspection_data.get('building_name', 'N/A')}"
-        ws['A1'].font = Font(size=14, bold=True, color="366092")
-        ws['A1'].alignment = Alignment(horizontal="center")
+        ws.append([_styled_cell(
+            ws, f"Inspection: {inspection_data.get('building_name', 'N/A')}",
+            font=Font(size=14, bold=True, color="366092"),
+            alignment=Alignment(horizontal="center")
+        )])
+        ws.merged_cells.add('A1:H1')
+        ws.append([])
         
         # Details
-        current_row = 3
-        ws[f'A{current_row}'] = "Inspection Date:"
-        ws[f'B{current_row}'] = inspection_data.get('inspection_date', 'N/A')
-        current_row += 1
-        ws[f'A{current_row}'] = "Inspector:"
-        ws[f'B{current_row}'] = inspection_data.get('inspector_name', 'N/A')
-        current_row += 2
+        ws.append(["Inspection Date:", inspection_data.get('inspection_date', 'N/A')])
+        ws.append(["Inspector:", inspection_data.get('inspector_name', 'N/A')])
+        ws.append([])
         
-        # Headers
-        headers = ['Room', 'Component', 'Issue Description', 'Trade', 'Priority', 'Status', 'Inspector Notes', 'Photo']
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=current_row, column=col_num)
-            cell.value = header
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-            cell.border = thin_border
+        self._append_defect_rows(ws, defects, header_row=6)
+    
+    def _append_defect_rows(self, ws, defects: List[Dict[str, Any]], header_row: int) -> int:
+        """
+        Append the defect table (header plus one row per defect) to a write-only worksheet
         
-        current_row += 1
+        Shared by the single and multi-inspection reports so both use one row path.
         
-        # Data rows (same logic as single inspection)
+        Args:
+            ws: Write-only worksheet positioned so the next append lands on header_row
+            defects: List of defect dictionaries
+            header_row: Row number the header row is appended at
+            
+        Returns:
+            Row number of the last row written
+        """
+        # Header Row
+        ws.append([
+            _styled_cell(ws, header, font=_HEADER_FONT, fill=_HEADER_FILL,
+                         alignment=_HEADER_ALIGNMENT, border=_THIN_BORDER)
+            for header in _DEFECT_HEADERS
+        ])
+        
+        # Download every photo up front rather than one GET per row
+        self.prefetch_photos([d['photo_url'] for d in defects if d.get('photo_url')])
+        
+        photo_column = get_column_letter(len(_DEFECT_HEADERS))
+        current_row = header_row
+        
+        # Data Rows
         for defect in defects:
+            current_row += 1
             has_photo = bool(defect.get('photo_url'))
-            ws.row_dimensions[current_row].height = 120 if has_photo else 30
-            
-            wrap_alignment = Alignment(vertical="top", wrap_text=True)
-            center_alignment = Alignment(horizontal="center", vertical="center")
             
-            # Add all cell data
-            ws.cell(row=current_row, column=1, value=defect.get('room', '')).alignment = wrap_alignment
-            ws.cell(row=current_row, column=2, value=defect.get('component', '')).alignment = wrap_alignment
-            ws.cell(row=current_row, column=3, value=defect.get('description', '')).alignment = wrap_alignment
-            ws.cell(row=current_row, column=4, value=defect.get('trade', '')).alignment = center_alignment
+            # Set row height (120 pixels for photos, 30 for no photos); must precede the append
+            ws.row_dimensions[current_row].height = 120 if has_photo else 30
             
-            priority_cell = ws.cell(row=current_row, column=5, value=defect.get('priority', ''))
-            priority_cell.alignment = center_alignment
+            # Color coding for priority
             priority = defect.get('priority', '')
-            if priority == 'High':
-                priority_cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-            elif priority == 'Medium':
-                priority_cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-            elif priority == 'Low':
-                priority_cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-            
-            ws.cell(row=current_row, column=6, value=defect.get('status', 'Open')).alignment = center_alignment
-            ws.cell(row=current_row, column=7, value=defect.get('inspector_notes', '')).alignment = wrap_alignment
-            
-            # Apply borders to all cells
-            for col in range(1, 9):
-                ws.cell(row=current_row, column=col).border = thin_border
+            priority_fill = _PRIORITY_FILLS.get(priority)
             
-            # Photo
+            # Photo (H)
+            photo_note = None
             if has_photo:
-                photo_url = defect['photo_url']
-                img = self.download_photo(photo_url)
+                thumbnail = self.photo_cache.get(defect['photo_url'])
                 
-                if img:
-                    img_bytes = self.resize_to_thumbnail(img, size=(150, 150))
-                    xl_img = XLImage(img_bytes)
-                    cell_letter = get_column_letter(8)
-                    xl_img.anchor = f'{cell_letter}{current_row}'
+                if thumbnail:
+                    # Create Excel image object from the cached thumbnail and add to worksheet
+                    xl_img = XLImage(BytesIO(thumbnail))
+                    xl_img.anchor = f'{photo_column}{current_row}'
                     ws.add_image(xl_img)
                 else:
-                    ws.cell(row=current_row, column=8, value="Photo unavailable")
-            
-            current_row += 1
+                    photo_note = "Photo unavailable"
+            
+            # Room, Component, Issue Description, Trade, Priority, Status, Inspector Notes, Photo
+            ws.append([
+                _styled_cell(ws, defect.get('room', ''), alignment=_WRAP_ALIGNMENT, border=_THIN_BORDER),
+                _styled_cell(ws, defect.get('component', ''), alignment=_WRAP_ALIGNMENT, border=_THIN_BORDER),
+                _styled_cell(ws, defect.get('description', ''), alignment=_WRAP_ALIGNMENT, border=_THIN_BORDER),
+                _styled_cell(ws, defect.get('trade', ''), alignment=_CENTER_ALIGNMENT, border=_THIN_BORDER),
+                _styled_cell(ws, priority, fill=priority_fill, alignment=_CENTER_ALIGNMENT, border=_THIN_BORDER),
+                _styled_cell(ws, defect.get('status', 'Open'), alignment=_CENTER_ALIGNMENT, border=_THIN_BORDER),
+                _styled_cell(ws, defect.get('inspector_notes', ''), alignment=_WRAP_ALIGNMENT, border=_THIN_BORDER),
+                _styled_cell(ws, photo_note, alignment=_CENTER_ALIGNMENT, border=_THIN_BORDER)
+            ])
+        
+        return current_row
+
+
+
+def _encode_thumbnail(img: Image.Image, size: tuple) -> BytesIO:
+    """Thumbnail an image IN PLACE and encode it as an RGB JPEG
+    
+    Downloaded photos are used once, so _fetch_photo skips the full-resolution copy.
+    """
+    # Calculate aspect ratio preserving resize
+    img.thumbnail(size, Image.Resampling.LANCZOS)
+    
+    # JPEG has no alpha: flatten transparent or palette images onto white
+    if img.mode not in ('RGB', 'L'):
+        rgba = img.convert('RGBA')
+        img = Image.new('RGB', rgba.size, 'white')
+        img.paste(rgba, mask=rgba.getchannel('A'))
+    
+    # Save to BytesIO; site photos are far smaller and quicker to encode as JPEG than PNG
+    output = BytesIO()
+    img.save(output, format='JPEG', quality=80, optimize=False, progressive=False)
+    output.seek(0)
+    
+    return output
+
+
+def _set_defect_column_widths(ws):
+    """Apply the defect table column widths (before any row on write-only sheets)"""
+    for column, width in _DEFECT_COLUMN_WIDTHS:
+        ws.column_dimensions[column].width = width
+
+
+def _defect_counts(defects: List[Dict[str, Any]]) -> tuple:
+    """Count defects, defects with photos and defects with notes in one pass"""
+    photo_count = note_count = 0
+    for defect in defects:
+        if defect.get('photo_url'):
+            photo_count += 1
+        if defect.get('inspector_notes'):
+            note_count += 1
+    return len(defects), photo_count, note_count
+
+
+def _styled_cell(ws, value, font=None, fill=None, alignment=None, border=None) -> WriteOnlyCell:
+    """Build a cell for ws.append carrying the given styles (None leaves the default)"""
+    cell = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if alignment is not None:
+        cell.alignment = alignment
+    if border is not None:
+        cell.border = border
+    return cell
 
 
 def create_excel_report_from_database(
@@ -524,14 +539,11 @@ def create_excel_report_from_database(
             return generator.generate_single_inspection_report(inspection_data, defects, output_path)
         
         elif report_type == "multi":
-            # Query multiple inspections
-            inspections = []
-            for inspection_id in inspection_ids:
-                inspection_data, defects = _query_inspection_data(db_connection, inspection_id)
-                inspections.append({
-                    'inspection_data': inspection_data,
-                    'defects': defects
-                })
+            # Query multiple inspections (two round-trips however many are selected)
+            inspections = [
+                {'inspection_data': inspection_data, 'defects': defects}
+                for inspection_data, defects in _query_many_inspections(db_connection, inspection_ids)
+            ]
             return generator.generate_multi_inspection_report(inspections, output_path)
         
         else:
@@ -571,16 +583,11 @@ def _query_inspection_data(db_connection, inspection_id: int) -> tuple:
     if not row:
         raise ValueError(f"Inspection {inspection_id} not found")
     
-    inspection_data = {
-        'id': row[0],
-        'inspection_date': row[1].strftime('%Y-%m-%d') if row[1] else 'N/A',
-        'inspector_name': row[2] or 'N/A',
-        'total_defects': row[3],
-        'building_name': row[4]
-    }
+    inspection_data = _inspection_row_to_dict(row)
+    cursor.close()
     
     # Query defects
-    cursor.execute("""
+    defect_rows = _iter_server_side(db_connection, f"defects_{inspection_id}", """
         SELECT room, component, notes, trade, urgency, status_class,
             photo_url, photo_media_id, inspector_notes
         FROM inspector_inspection_items
@@ -588,19 +595,98 @@ def _query_inspection_data(db_connection, inspection_id: int) -> tuple:
         ORDER BY room, component
     """, (inspection_id,))
     
-    defects = []
-    for row in cursor.fetchall():
-        defects.append({
-            'room': row[0],
-            'component': row[1],
-            'description': row[2],  # notes → description
-            'trade': row[3],
-            'priority': row[4],  # urgency → priority
-            'status': row[5],  # status_class → status
-            'photo_url': row[6],
-            'photo_media_id': row[7],
-            'inspector_notes': row[8]
-        })
+    defects = [_defect_row_to_dict(row) for row in defect_rows]
     
+    return inspection_data, defects
+
+
+def _query_many_inspections(db_connection, inspection_ids: List[int]) -> List[tuple]:
+    """
+    Query several inspections and their defects in two round-trips
+    
+    Args:
+        db_connection: Database connection
+        inspection_ids: IDs of the inspections, in report order
+        
+    Returns:
+        List of (inspection_data dict, defects list) tuples in inspection_ids order
+    """
+    ids = list(inspection_ids)
+    cursor = db_connection.cursor()
+    
+    # Query inspection metadata
+    cursor.execute("""
+        SELECT i.id, i.inspection_date, i.inspector_name, i.total_defects,
+               b.name as building_name
+        FROM inspector_inspections i
+        JOIN inspector_buildings b ON i.building_id = b.id
+        WHERE i.id = ANY(%s)
+    """, (ids,))
+    
+    inspections_by_id = {row[0]: _inspection_row_to_dict(row) for row in cursor.fetchall()}
+    missing = [inspection_id for inspection_id in ids if inspection_id not in inspections_by_id]
     cursor.close()
-    return inspection_data, defects
\ No newline at end of file
+    if missing:
+        raise ValueError(f"Inspection {missing[0]} not found")
+    
+    # Query defects for every inspection, bucketed client-side
+    defect_rows = _iter_server_side(db_connection, "defects_batch", """
+        SELECT inspection_id, room, component, notes, trade, urgency, status_class,
+            photo_url, photo_media_id, inspector_notes
+        FROM inspector_inspection_items
+        WHERE inspection_id = ANY(%s)
+        ORDER BY inspection_id, room, component
+    """, (ids,))
+    
+    defects_by_id = defaultdict(list)
+    for row in defect_rows:
+        defects_by_id[row[0]].append(_defect_row_to_dict(row[1:]))
+    
+    return [(inspections_by_id[inspection_id], defects_by_id[inspection_id]) for inspection_id in ids]
+
+
+def _iter_server_side(db_connection, cursor_name: str, query: str, params: tuple):
+    """
+    Stream query rows through a server-side (named) cursor
+    
+    Rows arrive DEFECT_FETCH_SIZE at a time instead of being materialised
+    with fetchall(), so large buildings never hold the whole rowset as tuples.
+    """
+    cursor = db_connection.cursor(name=cursor_name)
+    cursor.itersize = DEFECT_FETCH_SIZE
+    try:
+        cursor.execute(query, params)
+        yield from cursor
+    finally:
+        cursor.close()
+
+
+def _inspection_row_to_dict(row) -> Dict[str, Any]:
+    """Map an inspector_inspections row (id, date, inspector, total, building) to report metadata"""
+    return {
+        'id': row[0],
+        'inspection_date': row[1].strftime('%Y-%m-%d') if row[1] else 'N/A',
+        'inspector_name': row[2] or 'N/A',
+        'total_defects': row[3],
+        'building_name': row[4]
+    }
+
+
+def _defect_row_to_dict(row) -> Dict[str, Any]:
+    """Map an inspector_inspection_items row to the defect dict the sheet builders read"""
+    return {
+        'room': _intern(row[0]),
+        'component': row[1],
+        'description': row[2],  # notes → description
+        'trade': _intern(row[3]),
+        'priority': _intern(row[4]),  # urgency → priority
+        'status': _intern(row[5]),  # status_class → status
+        'photo_url': row[6],
+        'photo_media_id': row[7],
+        'inspector_notes': row[8]
+    }
+
+
+def _intern(value):
+    """Intern low-cardinality labels (room, trade, priority, status) so every row shares one object"""
+    return sys.intern(value) if isinstance(value, str) else value
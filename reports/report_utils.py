@@ -217,4 +217,5 @@ def create_summary_dataframe(metrics_dict):
             'Value': formatted_value
         })
     
-    return pd.DataFrame(summary_data)
\ No newline at end of file
+    return pd.DataFrame(summary_data)
+